@@ -4,9 +4,9 @@ from app.models import Assignment, Submission, AssignmentGroup, Enrollment
 from app.auth import jwt_required, faculty_required, student_required, institution_member_required
 from app.utils.s3 import upload_file_to_s3
 from app.services.grading import calculate_final_grade
-from app.utils.validators import AssignmentCreateSchema
+from app.utils.validators import assignment_create_schema
 from marshmallow import ValidationError
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 bp = Blueprint('assignments', __name__)
@@ -16,9 +16,8 @@ logger = logging.getLogger(__name__)
 @jwt_required
 @faculty_required(institution_id_param='institution_id')
 def create_assignment():
-    schema = AssignmentCreateSchema()
     try:
-        data = schema.load(request.json)
+        data = assignment_create_schema.load(request.json)
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
 
@@ -63,7 +62,7 @@ def submit_assignment(id):
         return jsonify({'msg': 'Already submitted'}), 400
 
     # Check due date and late policy
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     status = 'submitted'
     if now > assignment.due_date:
         if assignment.late_policy == 'not_allowed':
@@ -122,7 +121,7 @@ def grade_submission(submission_id):
     if grade is not None:
         submission.grade = grade
         submission.feedback = feedback
-        submission.graded_at = datetime.utcnow()
+        submission.graded_at = datetime.now(timezone.utc)
         submission.status = 'graded'
         db.session.commit()
 
@@ -3,20 +3,19 @@ from app import db
 from app.models import User
 from werkzeug.security import check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from app.utils.validators import UserRegistrationSchema, validate_password
+from app.utils.validators import user_registration_schema, validate_password
 from marshmallow import ValidationError
 from app.auth import jwt_required as auth_jwt_required
 from app.services.notification import notify_user
 from app.utils.compliance import record_consent
-from datetime import datetime
+from datetime import datetime, timezone
 
 bp = Blueprint('auth', __name__)
 
 @bp.route('/register', methods=['POST'])
 def register():
-    schema = UserRegistrationSchema()
     try:
-        data = schema.load(request.json)
+        data = user_registration_schema.load(request.json)
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
 
@@ -49,7 +48,7 @@ def login():
     if not user.is_active:
         return jsonify({'msg': 'Account is disabled'}), 401
 
-    user.last_login = datetime.utcnow()
+    user.last_login = datetime.now(timezone.utc)
     db.session.commit()
 
     # Audit log
@@ -4,7 +4,7 @@ from app.models import Course, CourseOffering, Enrollment, User, Assignment
 from app.auth import jwt_required, faculty_required, admin_required, student_required, institution_member_required
 from app.services.enrollment import enroll_student
 from app.utils.pagination import paginate
-from app.utils.validators import CourseCreateSchema
+from app.utils.validators import course_create_schema
 from marshmallow import ValidationError
 from app.extensions import cache
 
@@ -17,9 +17,8 @@ class CourseSchema:
 @jwt_required
 @faculty_required(institution_id_param='institution_id')
 def create_course():
-    schema = CourseCreateSchema()
     try:
-        data = schema.load(request.json)
+        data = course_create_schema.load(request.json)
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
 
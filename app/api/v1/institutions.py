@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify, g
 from app import db
 from app.models import Institution, UserRole, Role
 from app.auth import jwt_required, admin_required
-from app.utils.validators import InstitutionCreateSchema
+from app.utils.validators import institution_create_schema
 from marshmallow import ValidationError
 from app.utils.pagination import paginate
 from app.services.analytics import institution_stats
@@ -13,9 +13,8 @@ bp = Blueprint('institutions', __name__)
 @bp.route('', methods=['POST'])
 @jwt_required
 def create_institution():
-    schema = InstitutionCreateSchema()
     try:
-        data = schema.load(request.json)
+        data = institution_create_schema.load(request.json)
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
 
@@ -5,8 +5,9 @@ from functools import wraps
 from typing import Callable, Optional, Any
 from flask import request, jsonify, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-from app.models import User, UserRole, Role
+from app.models import User, UserRole
 from app.extensions import db
+from app.utils.lookups import get_role_id, get_role_permissions
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,20 +50,14 @@ def role_required(required_role: str,
             if not inst_id:
                 return jsonify({'msg': 'Institution ID required'}), 400
 
-            # Check if user has admin role (if allowed)
-            if allow_admin:
-                admin_role = UserRole.query.filter_by(
-                    user_id=g.current_user.id,
-                    institution_id=inst_id
-                ).join(Role).filter(Role.name == 'admin').first()
-                if admin_role:
-                    return fn(*args, **kwargs)
-
-            # Check for required role
-            user_role = UserRole.query.filter_by(
-                user_id=g.current_user.id,
-                institution_id=inst_id
-            ).join(Role).filter(Role.name == required_role).first()
+            # Required role, or admin if allowed to bypass (role ids are cached)
+            role_names = [required_role, 'admin'] if allow_admin else [required_role]
+            role_ids = [rid for rid in map(get_role_id, role_names) if rid is not None]
+            user_role = UserRole.query.filter(
+                UserRole.user_id == g.current_user.id,
+                UserRole.institution_id == inst_id,
+                UserRole.role_id.in_(role_ids)
+            ).first() if role_ids else None
             if not user_role:
                 return jsonify({'msg': f'Role {required_role} required in this institution'}), 403
             return fn(*args, **kwargs)
@@ -81,12 +76,13 @@ def permissions_required(permission: str,
                        request.args.get('institution_id'))
             if not inst_id:
                 return jsonify({'msg': 'Institution ID required'}), 400
-            user_roles = UserRole.query.filter_by(
+            role_ids = db.session.query(UserRole.role_id).filter_by(
                 user_id=g.current_user.id,
                 institution_id=inst_id
             ).all()
-            for ur in user_roles:
-                if permission in ur.role.permissions or '*' in ur.role.permissions:
+            for (role_id,) in role_ids:
+                permissions = get_role_permissions(role_id)
+                if permission in permissions or '*' in permissions:
                     return fn(*args, **kwargs)
             return jsonify({'msg': 'Permission denied'}), 403
         return wrapper
@@ -156,8 +152,9 @@ def platform_admin_required() -> Callable:
         def wrapper(*args, **kwargs):
             platform_admin = UserRole.query.filter_by(
                 user_id=g.current_user.id,
-                institution_id=None
-            ).join(Role).filter(Role.name == 'platform_admin').first()
+                institution_id=None,
+                role_id=get_role_id('platform_admin')
+            ).first()
             if not platform_admin:
                 return jsonify({'msg': 'Platform admin required'}), 403
             return fn(*args, **kwargs)
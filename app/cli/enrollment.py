@@ -0,0 +1,10 @@
+import click
+from flask.cli import with_appcontext
+from app.utils.enrollment import recount_enrolled
+
+@click.command('backfill-enrolled-counts')
+@with_appcontext
+def backfill_enrolled_counts():
+    """Recompute course_offerings.enrolled_count from enrollments."""
+    updated = recount_enrolled()
+    click.echo(f"Recounted enrollments for {updated} offerings")
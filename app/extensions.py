@@ -3,12 +3,12 @@ Database models for ChangeX Eduspace.
 Includes multi-tenancy, RBAC, and core educational entities.
 """
 from __future__ import annotations
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timezone
 from typing import Optional, List, Dict, Any, Union
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey,
-    Table, Text, Float, Numeric, Index, CheckConstraint, UniqueConstraint,
-    Date, Time
+    Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey,
+    Table, Text, Float, Index, CheckConstraint, UniqueConstraint,
+    Date, Time, Computed, Enum, DDL, event
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
@@ -19,6 +19,17 @@ import re
 
 from app.extensions import db
 
+
+def utcnow() -> datetime:
+    """Timezone-aware UTC timestamp used for all TIMESTAMPTZ defaults."""
+    return datetime.now(timezone.utc)
+
+# Native Postgres ENUM types for frequently filtered status columns
+EnrollmentStatus = Enum('enrolled', 'dropped', 'completed', name='enrollment_status')
+SubmissionStatus = Enum('submitted', 'late', 'graded', name='submission_status')
+AttendanceStatus = Enum('present', 'absent', 'late', 'excused', name='attendance_status')
+
+
 # Association tables with type annotations
 course_prerequisites = Table(
     'course_prerequisites',
@@ -46,9 +57,9 @@ class User(db.Model):
     profile: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     email_verified: Mapped[bool] = mapped_column(Boolean, default=False)
-    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # New fields for student/alumni records
     matric_number: Mapped[Optional[str]] = mapped_column(String(20), unique=True)
@@ -125,10 +136,10 @@ class Institution(db.Model):
     domain: Mapped[Optional[str]] = mapped_column(String(100), unique=True)
     branding: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     subscription_tier: Mapped[str] = mapped_column(String(20), default='free')
-    subscription_expires: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    subscription_expires: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     features: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     settings: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     departments: Mapped[List['Department']] = relationship(back_populates='institution', cascade='all, delete-orphan')
@@ -175,7 +186,7 @@ class UserRole(db.Model):
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
     role_id: Mapped[int] = mapped_column(Integer, ForeignKey('roles.id'), nullable=False)
     context: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})  # e.g., department_id
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped['User'] = relationship(back_populates='roles')
@@ -197,7 +208,7 @@ class Department(db.Model):
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('departments.id'))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='departments')
@@ -220,15 +231,15 @@ class Course(db.Model):
     credits: Mapped[int] = mapped_column(Integer, default=3)
     syllabus: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     status: Mapped[str] = mapped_column(String(20), default='active')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # New fields for approval workflow
     submitted_for_approval: Mapped[bool] = mapped_column(Boolean, default=False)
     approval_notes: Mapped[Optional[str]] = mapped_column(Text)
     approved_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     rejected_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    rejected_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    rejected_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     rejection_reason: Mapped[Optional[str]] = mapped_column(Text)
 
     # Relationships
@@ -263,8 +274,10 @@ class CourseOffering(db.Model):
     schedule: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     room: Mapped[Optional[str]] = mapped_column(String(50))
     capacity: Mapped[int] = mapped_column(Integer, default=30)
+    # Denormalized count of 'enrolled' rows, maintained by enroll_student under a row lock
+    enrolled_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
     status: Mapped[str] = mapped_column(String(20), default='active')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course: Mapped['Course'] = relationship(back_populates='offerings')
@@ -282,11 +295,6 @@ class CourseOffering(db.Model):
         UniqueConstraint('course_id', 'term', 'year', name='unique_course_offering'),
     )
 
-    @property
-    def enrolled_count(self) -> int:
-        """Current number of enrolled students."""
-        return len([e for e in self.enrollments if e.status == 'enrolled'])
-
     @property
     def available_seats(self) -> int:
         return self.capacity - self.enrolled_count
@@ -301,11 +309,19 @@ class Enrollment(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
-    status: Mapped[str] = mapped_column(String(20), default='enrolled')
-    enrollment_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    status: Mapped[str] = mapped_column(EnrollmentStatus, default='enrolled')
+    enrollment_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     grade: Mapped[Optional[float]] = mapped_column(Float)
-    letter_grade: Mapped[Optional[str]] = mapped_column(String(2))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    letter_grade: Mapped[Optional[str]] = mapped_column(
+        String(2),
+        Computed(
+            "CASE WHEN grade >= 90 THEN 'A' WHEN grade >= 80 THEN 'B' "
+            "WHEN grade >= 70 THEN 'C' WHEN grade >= 60 THEN 'D' "
+            "WHEN grade IS NOT NULL THEN 'F' END",
+            persisted=True
+        )
+    )  # generated from grade by the database
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     student: Mapped['User'] = relationship(back_populates='enrollments')
@@ -328,7 +344,7 @@ class AssignmentGroup(db.Model):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     weight: Mapped[float] = mapped_column(Float, nullable=False)
     drop_lowest: Mapped[int] = mapped_column(Integer, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped['CourseOffering'] = relationship(back_populates='assignment_groups')
@@ -346,7 +362,7 @@ class Assignment(db.Model):
     group_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('assignment_groups.id'))
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
-    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     points_possible: Mapped[float] = mapped_column(Float, default=100.0)
     rubric: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     submission_type: Mapped[str] = mapped_column(String(20), default='file')
@@ -354,7 +370,7 @@ class Assignment(db.Model):
     max_file_size: Mapped[int] = mapped_column(Integer, default=10485760)
     late_policy: Mapped[str] = mapped_column(String(20), default='not_allowed')
     late_penalty: Mapped[float] = mapped_column(Float, default=0.10)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # New fields for exams
     is_exam: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -381,11 +397,11 @@ class Submission(db.Model):
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     file_url: Mapped[Optional[str]] = mapped_column(String(500))
     text: Mapped[Optional[str]] = mapped_column(Text)
-    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     grade: Mapped[Optional[float]] = mapped_column(Float)
     feedback: Mapped[Optional[str]] = mapped_column(Text)
-    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    status: Mapped[str] = mapped_column(String(20), default='submitted')
+    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    status: Mapped[str] = mapped_column(SubmissionStatus, default='submitted')
 
     # Relationships
     assignment: Mapped['Assignment'] = relationship(back_populates='submissions')
@@ -407,8 +423,8 @@ class Grade(db.Model):
     assignment_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('assignments.id'))
     points_earned: Mapped[Optional[float]] = mapped_column(Float)
     percentage: Mapped[Optional[float]] = mapped_column(Float)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     enrollment: Mapped['Enrollment'] = relationship(back_populates='grades')
@@ -422,8 +438,8 @@ class Attendance(db.Model):
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
-    status: Mapped[str] = mapped_column(String(20), default='present')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    status: Mapped[str] = mapped_column(AttendanceStatus, default='present')
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped['CourseOffering'] = relationship(back_populates='attendance_records')
@@ -440,7 +456,7 @@ class Waitlist(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     notified: Mapped[bool] = mapped_column(Boolean, default=False)
 
     # Relationships
@@ -462,8 +478,8 @@ class Announcement(db.Model):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     priority: Mapped[str] = mapped_column(String(20), default='normal')
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='announcements')
@@ -480,7 +496,7 @@ class Message(db.Model):
     subject: Mapped[Optional[str]] = mapped_column(String(200))
     body: Mapped[str] = mapped_column(Text, nullable=False)
     read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     sender: Mapped['User'] = relationship(foreign_keys=[sender_id], back_populates='messages_sent')
@@ -497,7 +513,7 @@ class Notification(db.Model):
     message: Mapped[Optional[str]] = mapped_column(Text)
     data: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped['User'] = relationship(back_populates='notifications')
@@ -515,7 +531,7 @@ class Resource(db.Model):
     metadata: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     visibility: Mapped[str] = mapped_column(String(20), default='institution')
     created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='resources')
@@ -531,7 +547,7 @@ class Integration(db.Model):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     config: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='integrations')
@@ -543,18 +559,27 @@ class Payment(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
-    amount: Mapped[float] = mapped_column(Numeric(10,2), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
     currency: Mapped[str] = mapped_column(String(3), default='USD')
     status: Mapped[str] = mapped_column(String(20), default='pending')
     stripe_payment_intent_id: Mapped[Optional[str]] = mapped_column(String(100))
     paystack_reference: Mapped[Optional[str]] = mapped_column(String(100))  # For Paystack
     description: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped['User'] = relationship(back_populates='payments')
     institution: Mapped['Institution'] = relationship(back_populates='payments')
 
+    @hybrid_property
+    def amount(self) -> float:
+        """Amount in major currency units; stored as integer cents."""
+        return self.amount_cents / 100
+
+    @amount.setter
+    def amount(self, value) -> None:
+        self.amount_cents = int(round(value * 100))
+
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
@@ -567,7 +592,7 @@ class AuditLog(db.Model):
     changes: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))
     user_agent: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped['User'] = relationship(back_populates='audit_logs')
@@ -580,7 +605,7 @@ class FeatureFlag(db.Model):
     institution_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('institutions.id'))
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     enabled: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='feature_flags')
@@ -596,8 +621,8 @@ class GDPRConsent(db.Model):
     given: Mapped[bool] = mapped_column(Boolean, default=False)
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))
     user_agent: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     user: Mapped['User'] = relationship(back_populates='consent_records')
@@ -612,13 +637,13 @@ class LiveSession(db.Model):
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
-    start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     meeting_url: Mapped[Optional[str]] = mapped_column(String(500))
     recording_url: Mapped[Optional[str]] = mapped_column(String(500))
     status: Mapped[str] = mapped_column(String(20), default='scheduled')
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped['CourseOffering'] = relationship(back_populates='live_sessions')
@@ -631,8 +656,8 @@ class AttendanceSession(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     live_session_id: Mapped[int] = mapped_column(Integer, ForeignKey('live_sessions.id'), nullable=False)
-    join_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    leave_time: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    join_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    leave_time: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     active_time: Mapped[int] = mapped_column(Integer, default=0)  # in seconds
     total_duration: Mapped[int] = mapped_column(Integer, default=0)  # computed on leave
 
@@ -646,7 +671,7 @@ class ProctoringLog(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     exam_id: Mapped[int] = mapped_column(Integer, ForeignKey('assignments.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     event_type: Mapped[str] = mapped_column(String(50))
     screenshot_url: Mapped[Optional[str]] = mapped_column(String(500))
     metadata: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
@@ -661,8 +686,8 @@ class ExamSession(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     exam_id: Mapped[int] = mapped_column(Integer, ForeignKey('assignments.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     answers: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     status: Mapped[str] = mapped_column(String(20), default='in_progress')
     flagged: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -681,7 +706,7 @@ class Policy(db.Model):
     policy_type: Mapped[str] = mapped_column(String(50))
     content: Mapped[str] = mapped_column(Text, nullable=False)
     version: Mapped[int] = mapped_column(Integer, default=1)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
     # Relationships
@@ -694,7 +719,7 @@ class UserPolicyAcceptance(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     policy_id: Mapped[int] = mapped_column(Integer, ForeignKey('policies.id'), nullable=False)
-    accepted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    accepted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))
     user_agent: Mapped[Optional[str]] = mapped_column(String(200))
 
@@ -747,9 +772,9 @@ class AdmissionApplication(db.Model):
     jamb_score: Mapped[int] = mapped_column(Integer)
     olevel_results: Mapped[Dict[str, Any]] = mapped_column(JSONB)
     status: Mapped[str] = mapped_column(String(20), default='pending')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     admitted_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    admitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    admitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     institution: Mapped['Institution'] = relationship(back_populates='admission_applications')
@@ -763,10 +788,10 @@ class SemesterRegistration(db.Model):
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
     academic_session: Mapped[str] = mapped_column(String(20))
     semester: Mapped[str] = mapped_column(String(10))
-    registration_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    registration_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     status: Mapped[str] = mapped_column(String(20), default='draft')
     approved_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     student: Mapped['User'] = relationship(back_populates='registered_semesters')
@@ -809,7 +834,7 @@ class ExamAttendance(db.Model):
     exam_timetable_id: Mapped[int] = mapped_column(Integer, ForeignKey('exam_timetables.id'))
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
     signed_in: Mapped[bool] = mapped_column(Boolean, default=False)
-    signed_in_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    signed_in_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     exam_timetable: Mapped['ExamTimetable'] = relationship(back_populates='attendances')
@@ -862,7 +887,7 @@ class HostelApplication(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     hostel_id: Mapped[int] = mapped_column(Integer, ForeignKey('hostels.id'))
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
-    application_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    application_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     status: Mapped[str] = mapped_column(String(20), default='pending')
     preferred_room_type: Mapped[Optional[str]] = mapped_column(String(50))
 
@@ -893,9 +918,9 @@ class BorrowingRecord(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
     resource_id: Mapped[int] = mapped_column(Integer, ForeignKey('library_resources.id'))
-    borrowed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    borrowed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     due_date: Mapped[date] = mapped_column(Date)
-    returned_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    returned_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     fine: Mapped[float] = mapped_column(Float, default=0.0)
 
     # Relationships
@@ -929,7 +954,7 @@ class LeaveApplication(db.Model):
     reason: Mapped[str] = mapped_column(Text)
     status: Mapped[str] = mapped_column(String(20), default='pending')
     approved_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     staff: Mapped['StaffProfile'] = relationship(back_populates='leave_applications')
@@ -965,7 +990,9 @@ class AcademicCalendar(db.Model):
 
 # Indexes for performance
 Index('idx_enrollment_user', Enrollment.user_id)
-Index('idx_enrollment_offering', Enrollment.course_offering_id)
+Index('idx_enrollment_offering_status', Enrollment.course_offering_id, Enrollment.status)
+Index('idx_enrollment_offering_enrolled', Enrollment.course_offering_id,
+      postgresql_where=Enrollment.status == 'enrolled')
 Index('idx_assignment_offering', Assignment.course_offering_id)
 Index('idx_submission_assignment', Submission.assignment_id)
 Index('idx_submission_user', Submission.user_id)
@@ -974,7 +1001,7 @@ Index('idx_attendance_user', Attendance.user_id)
 Index('idx_notification_user_read', Notification.user_id, Notification.read)
 Index('idx_auditlog_user', AuditLog.user_id)
 Index('idx_auditlog_created', AuditLog.created_at)
-Index('idx_gdpr_user', GDPRConsent.user_id)
+Index('idx_gdpr_user_type_created', GDPRConsent.user_id, GDPRConsent.consent_type, GDPRConsent.created_at.desc())
 Index('idx_live_session_offering', LiveSession.course_offering_id)
 Index('idx_attendance_session_user', AttendanceSession.user_id)
 Index('idx_exam_session_user', ExamSession.user_id)
@@ -982,3 +1009,29 @@ Index('idx_proctoring_log_user', ProctoringLog.user_id)
 Index('idx_registered_course_reg', RegisteredCourse.semester_registration_id)
 Index('idx_borrowing_user', BorrowingRecord.user_id)
 Index('idx_leave_staff', LeaveApplication.staff_id)
+
+# Per-institution dashboard aggregates, refreshed every minute by
+# app.tasks.report_tasks.refresh_institution_stats
+event.listen(db.metadata, 'after_create', DDL("""
+CREATE MATERIALIZED VIEW IF NOT EXISTS institution_stats_mv AS
+SELECT i.id AS institution_id,
+    (SELECT count(*) FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+     WHERE ur.institution_id = i.id AND r.name = 'student') AS students,
+    (SELECT count(*) FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+     WHERE ur.institution_id = i.id AND r.name = 'faculty') AS faculty,
+    (SELECT count(*) FROM courses c
+     WHERE c.institution_id = i.id) AS courses,
+    (SELECT count(*) FROM course_offerings co JOIN courses c ON c.id = co.course_id
+     WHERE c.institution_id = i.id AND co.status = 'active') AS active_offerings,
+    (SELECT count(*) FROM enrollments e
+     JOIN course_offerings co ON co.id = e.course_offering_id
+     JOIN courses c ON c.id = co.course_id
+     WHERE c.institution_id = i.id AND e.status = 'enrolled') AS enrollments,
+    (SELECT coalesce(sum(p.amount_cents), 0) FROM payments p
+     WHERE p.institution_id = i.id AND p.status = 'completed') AS revenue_cents
+FROM institutions i;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_institution_stats_mv ON institution_stats_mv (institution_id);
+""").execute_if(dialect='postgresql'))
+event.listen(db.metadata, 'before_drop', DDL(
+    "DROP MATERIALIZED VIEW IF EXISTS institution_stats_mv"
+).execute_if(dialect='postgresql'))
@@ -3,11 +3,11 @@ Database models for ChangeX Eduspace.
 Includes multi-tenancy, RBAC, and core educational entities.
 """
 from __future__ import annotations
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any, Union
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey, 
-    Table, Text, Float, Numeric, Index, CheckConstraint, UniqueConstraint
+    Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, 
+    Table, Text, Float, Index, CheckConstraint, UniqueConstraint, Computed, Enum, DDL, event
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
@@ -18,6 +18,16 @@ import re
 
 from app.extensions import db
 
+
+def utcnow() -> datetime:
+    """Timezone-aware UTC timestamp used for all TIMESTAMPTZ defaults."""
+    return datetime.now(timezone.utc)
+
+# Native Postgres ENUM types for frequently filtered status columns
+EnrollmentStatus = Enum('enrolled', 'dropped', 'completed', name='enrollment_status')
+SubmissionStatus = Enum('submitted', 'late', 'graded', name='submission_status')
+AttendanceStatus = Enum('present', 'absent', 'late', 'excused', name='attendance_status')
+
 # Association tables with type annotations
 course_prerequisites = Table(
     'course_prerequisites',
@@ -37,9 +47,9 @@ class User(db.Model):
     profile: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     email_verified: Mapped[bool] = mapped_column(Boolean, default=False)
-    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     roles: Mapped[List[UserRole]] = relationship(back_populates='user', cascade='all, delete-orphan')
@@ -87,10 +97,10 @@ class Institution(db.Model):
     domain: Mapped[Optional[str]] = mapped_column(String(100), unique=True)
     branding: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     subscription_tier: Mapped[str] = mapped_column(String(20), default='free')
-    subscription_expires: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    subscription_expires: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     features: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     settings: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     departments: Mapped[List[Department]] = relationship(back_populates='institution', cascade='all, delete-orphan')
@@ -125,7 +135,7 @@ class UserRole(db.Model):
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
     role_id: Mapped[int] = mapped_column(Integer, ForeignKey('roles.id'), nullable=False)
     context: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})  # e.g., department_id
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped[User] = relationship(back_populates='roles')
@@ -146,7 +156,7 @@ class Department(db.Model):
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('departments.id'))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='departments')
@@ -168,7 +178,7 @@ class Course(db.Model):
     credits: Mapped[int] = mapped_column(Integer, default=3)
     syllabus: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     status: Mapped[str] = mapped_column(String(20), default='active')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='courses')
@@ -199,8 +209,10 @@ class CourseOffering(db.Model):
     schedule: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     room: Mapped[Optional[str]] = mapped_column(String(50))
     capacity: Mapped[int] = mapped_column(Integer, default=30)
+    # Denormalized count of 'enrolled' rows, maintained by enroll_student under a row lock
+    enrolled_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
     status: Mapped[str] = mapped_column(String(20), default='active')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course: Mapped[Course] = relationship(back_populates='offerings')
@@ -216,11 +228,6 @@ class CourseOffering(db.Model):
         UniqueConstraint('course_id', 'term', 'year', name='unique_course_offering'),
     )
 
-    @property
-    def enrolled_count(self) -> int:
-        """Current number of enrolled students."""
-        return len([e for e in self.enrollments if e.status == 'enrolled'])
-
     @property
     def available_seats(self) -> int:
         return self.capacity - self.enrolled_count
@@ -234,11 +241,19 @@ class Enrollment(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
-    status: Mapped[str] = mapped_column(String(20), default='enrolled')
-    enrollment_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    status: Mapped[str] = mapped_column(EnrollmentStatus, default='enrolled')
+    enrollment_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     grade: Mapped[Optional[float]] = mapped_column(Float)
-    letter_grade: Mapped[Optional[str]] = mapped_column(String(2))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    letter_grade: Mapped[Optional[str]] = mapped_column(
+        String(2),
+        Computed(
+            "CASE WHEN grade >= 90 THEN 'A' WHEN grade >= 80 THEN 'B' "
+            "WHEN grade >= 70 THEN 'C' WHEN grade >= 60 THEN 'D' "
+            "WHEN grade IS NOT NULL THEN 'F' END",
+            persisted=True
+        )
+    )  # generated from grade by the database
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     student: Mapped[User] = relationship(back_populates='enrollments')
@@ -260,7 +275,7 @@ class AssignmentGroup(db.Model):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     weight: Mapped[float] = mapped_column(Float, nullable=False)
     drop_lowest: Mapped[int] = mapped_column(Integer, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped[CourseOffering] = relationship(back_populates='assignment_groups')
@@ -277,7 +292,7 @@ class Assignment(db.Model):
     group_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('assignment_groups.id'))
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
-    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     points_possible: Mapped[float] = mapped_column(Float, default=100.0)
     rubric: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     submission_type: Mapped[str] = mapped_column(String(20), default='file')
@@ -285,7 +300,7 @@ class Assignment(db.Model):
     max_file_size: Mapped[int] = mapped_column(Integer, default=10485760)
     late_policy: Mapped[str] = mapped_column(String(20), default='not_allowed')
     late_penalty: Mapped[float] = mapped_column(Float, default=0.10)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped[CourseOffering] = relationship(back_populates='assignments')
@@ -303,11 +318,11 @@ class Submission(db.Model):
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     file_url: Mapped[Optional[str]] = mapped_column(String(500))
     text: Mapped[Optional[str]] = mapped_column(Text)
-    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     grade: Mapped[Optional[float]] = mapped_column(Float)
     feedback: Mapped[Optional[str]] = mapped_column(Text)
-    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    status: Mapped[str] = mapped_column(String(20), default='submitted')
+    graded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    status: Mapped[str] = mapped_column(SubmissionStatus, default='submitted')
 
     # Relationships
     assignment: Mapped[Assignment] = relationship(back_populates='submissions')
@@ -328,8 +343,8 @@ class Grade(db.Model):
     assignment_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('assignments.id'))
     points_earned: Mapped[Optional[float]] = mapped_column(Float)
     percentage: Mapped[Optional[float]] = mapped_column(Float)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     enrollment: Mapped[Enrollment] = relationship(back_populates='grades')
@@ -342,8 +357,8 @@ class Attendance(db.Model):
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
-    status: Mapped[str] = mapped_column(String(20), default='present')
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    status: Mapped[str] = mapped_column(AttendanceStatus, default='present')
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     course_offering: Mapped[CourseOffering] = relationship(back_populates='attendance_records')
@@ -359,7 +374,7 @@ class Waitlist(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     course_offering_id: Mapped[int] = mapped_column(Integer, ForeignKey('course_offerings.id'), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     notified: Mapped[bool] = mapped_column(Boolean, default=False)
 
     # Relationships
@@ -380,8 +395,8 @@ class Announcement(db.Model):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     priority: Mapped[str] = mapped_column(String(20), default='normal')
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='announcements')
@@ -397,7 +412,7 @@ class Message(db.Model):
     subject: Mapped[Optional[str]] = mapped_column(String(200))
     body: Mapped[str] = mapped_column(Text, nullable=False)
     read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     sender: Mapped[User] = relationship(foreign_keys=[sender_id], back_populates='messages_sent')
@@ -413,7 +428,7 @@ class Notification(db.Model):
     message: Mapped[Optional[str]] = mapped_column(Text)
     data: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped[User] = relationship(back_populates='notifications')
@@ -430,7 +445,7 @@ class Resource(db.Model):
     metadata: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     visibility: Mapped[str] = mapped_column(String(20), default='institution')
     created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='resources')
@@ -445,7 +460,7 @@ class Integration(db.Model):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     config: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='integrations')
@@ -456,17 +471,26 @@ class Payment(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
     institution_id: Mapped[int] = mapped_column(Integer, ForeignKey('institutions.id'), nullable=False)
-    amount: Mapped[float] = mapped_column(Numeric(10,2), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
     currency: Mapped[str] = mapped_column(String(3), default='USD')
     status: Mapped[str] = mapped_column(String(20), default='pending')
     stripe_payment_intent_id: Mapped[Optional[str]] = mapped_column(String(100))
     description: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped[User] = relationship(back_populates='payments')
     institution: Mapped[Institution] = relationship(back_populates='payments')
 
+    @hybrid_property
+    def amount(self) -> float:
+        """Amount in major currency units; stored as integer cents."""
+        return self.amount_cents / 100
+
+    @amount.setter
+    def amount(self, value) -> None:
+        self.amount_cents = int(round(value * 100))
+
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
     
@@ -478,7 +502,7 @@ class AuditLog(db.Model):
     changes: Mapped[Dict[str, Any]] = mapped_column(JSONB, default={})
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))
     user_agent: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     user: Mapped[User] = relationship(back_populates='audit_logs')
@@ -490,7 +514,7 @@ class FeatureFlag(db.Model):
     institution_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('institutions.id'))
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     enabled: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     # Relationships
     institution: Mapped[Institution] = relationship(back_populates='feature_flags')
@@ -505,15 +529,17 @@ class GDPRConsent(db.Model):
     given: Mapped[bool] = mapped_column(Boolean, default=False)
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))
     user_agent: Mapped[Optional[str]] = mapped_column(String(200))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relationships
     user: Mapped[User] = relationship(back_populates='consent_records')
 
 # Indexes for performance
 Index('idx_enrollment_user', Enrollment.user_id)
-Index('idx_enrollment_offering', Enrollment.course_offering_id)
+Index('idx_enrollment_offering_status', Enrollment.course_offering_id, Enrollment.status)
+Index('idx_enrollment_offering_enrolled', Enrollment.course_offering_id,
+      postgresql_where=Enrollment.status == 'enrolled')
 Index('idx_assignment_offering', Assignment.course_offering_id)
 Index('idx_submission_assignment', Submission.assignment_id)
 Index('idx_submission_user', Submission.user_id)
@@ -522,4 +548,30 @@ Index('idx_attendance_user', Attendance.user_id)
 Index('idx_notification_user_read', Notification.user_id, Notification.read)
 Index('idx_auditlog_user', AuditLog.user_id)
 Index('idx_auditlog_created', AuditLog.created_at)
-Index('idx_gdpr_user', GDPRConsent.user_id)
+Index('idx_gdpr_user_type_created', GDPRConsent.user_id, GDPRConsent.consent_type, GDPRConsent.created_at.desc())
+
+# Per-institution dashboard aggregates, refreshed every minute by
+# app.tasks.report_tasks.refresh_institution_stats
+event.listen(db.metadata, 'after_create', DDL("""
+CREATE MATERIALIZED VIEW IF NOT EXISTS institution_stats_mv AS
+SELECT i.id AS institution_id,
+    (SELECT count(*) FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+     WHERE ur.institution_id = i.id AND r.name = 'student') AS students,
+    (SELECT count(*) FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+     WHERE ur.institution_id = i.id AND r.name = 'faculty') AS faculty,
+    (SELECT count(*) FROM courses c
+     WHERE c.institution_id = i.id) AS courses,
+    (SELECT count(*) FROM course_offerings co JOIN courses c ON c.id = co.course_id
+     WHERE c.institution_id = i.id AND co.status = 'active') AS active_offerings,
+    (SELECT count(*) FROM enrollments e
+     JOIN course_offerings co ON co.id = e.course_offering_id
+     JOIN courses c ON c.id = co.course_id
+     WHERE c.institution_id = i.id AND e.status = 'enrolled') AS enrollments,
+    (SELECT coalesce(sum(p.amount_cents), 0) FROM payments p
+     WHERE p.institution_id = i.id AND p.status = 'completed') AS revenue_cents
+FROM institutions i;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_institution_stats_mv ON institution_stats_mv (institution_id);
+""").execute_if(dialect='postgresql'))
+event.listen(db.metadata, 'before_drop', DDL(
+    "DROP MATERIALIZED VIEW IF EXISTS institution_stats_mv"
+).execute_if(dialect='postgresql'))
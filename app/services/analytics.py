@@ -3,60 +3,98 @@ Analytics and reporting services.
 """
 from app import db
 from app.models import (
-    Institution, User, Course, Enrollment, Submission, 
-    Attendance, Payment, UserRole, Role
+    Institution, User, Course, CourseOffering, Enrollment, Submission,
+    Assignment, Attendance, Payment, UserRole, Role, AuditLog
 )
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
+from app.extensions import cache
+from app.utils.cache import cached
+from sqlalchemy import func, and_, case, event, text
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 import logging
 
 logger = logging.getLogger(__name__)
 
+STATS_CACHE_TIMEOUT = 120
+
 def institution_stats(institution_id: int) -> dict:
     """
     Get aggregated stats for an institution.
+    Reads the institution_stats_mv materialized view (refreshed every minute),
+    which is cheap enough to read uncached; falls back to live aggregates
+    before the view has a row for the institution.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        row = db.session.execute(text(
+            "SELECT students, faculty, courses, active_offerings, enrollments, revenue_cents "
+            "FROM institution_stats_mv WHERE institution_id = :institution_id"
+        ), {'institution_id': institution_id}).first()
+        if row is not None:
+            return {
+                'students': row.students,
+                'faculty': row.faculty,
+                'courses': row.courses,
+                'active_offerings': row.active_offerings,
+                'enrollments': row.enrollments,
+                'revenue': row.revenue_cents / 100
+            }
+    return _live_institution_stats(institution_id)
+
+def _live_institution_stats(institution_id: int) -> dict:
+    """
+    Compute institution stats directly from the base tables.
+    Two round-trips: role counts grouped by role name, then the remaining
+    aggregates as scalar subqueries of a single SELECT.
     """
     # Count users by role
-    students = db.session.query(func.count(UserRole.id)).filter(
-        UserRole.institution_id == institution_id,
-        UserRole.role.has(Role.name == 'student')
-    ).scalar() or 0
-    
-    faculty = db.session.query(func.count(UserRole.id)).filter(
+    role_counts = dict(db.session.query(Role.name, func.count(UserRole.id)).join(
+        UserRole, UserRole.role_id == Role.id
+    ).filter(
         UserRole.institution_id == institution_id,
-        UserRole.role.has(Role.name == 'faculty')
-    ).scalar() or 0
-    
+        Role.name.in_(('student', 'faculty'))
+    ).group_by(Role.name).all())
+
     # Courses and offerings
-    courses = Course.query.filter_by(institution_id=institution_id).count()
-    active_offerings = Course.query.join(CourseOffering).filter(
+    courses = db.session.query(func.count(Course.id)).filter(
+        Course.institution_id == institution_id
+    ).scalar_subquery()
+    active_offerings = db.session.query(func.count(CourseOffering.id)).join(Course).filter(
         Course.institution_id == institution_id,
         CourseOffering.status == 'active'
-    ).count()
-    
+    ).scalar_subquery()
+
     # Enrollments
     enrollments = db.session.query(func.count(Enrollment.id)).join(
         CourseOffering
     ).join(Course).filter(
         Course.institution_id == institution_id,
         Enrollment.status == 'enrolled'
-    ).scalar() or 0
-    
+    ).scalar_subquery()
+
     # Revenue (completed payments)
-    revenue = db.session.query(func.sum(Payment.amount)).filter(
+    revenue_cents = db.session.query(func.coalesce(func.sum(Payment.amount_cents), 0)).filter(
         Payment.institution_id == institution_id,
         Payment.status == 'completed'
-    ).scalar() or 0
-    
+    ).scalar_subquery()
+
+    totals = db.session.query(
+        courses.label('courses'),
+        active_offerings.label('active_offerings'),
+        enrollments.label('enrollments'),
+        revenue_cents.label('revenue_cents')
+    ).one()
+
     return {
-        'students': students,
-        'faculty': faculty,
-        'courses': courses,
-        'active_offerings': active_offerings,
-        'enrollments': enrollments,
-        'revenue': float(revenue)
+        'students': role_counts.get('student', 0),
+        'faculty': role_counts.get('faculty', 0),
+        'courses': totals.courses,
+        'active_offerings': totals.active_offerings,
+        'enrollments': totals.enrollments,
+        'revenue': totals.revenue_cents / 100
     }
 
+@cached(timeout=STATS_CACHE_TIMEOUT, key_prefix='course_perf')
 def course_performance(course_offering_id: int) -> dict:
     """
     Get performance metrics for a specific course offering.
@@ -65,53 +103,54 @@ def course_performance(course_offering_id: int) -> dict:
     if not offering:
         return {}
     
-    enrollments = Enrollment.query.filter_by(
-        course_offering_id=course_offering_id,
-        status='enrolled'
-    ).all()
+    grade = func.coalesce(Enrollment.grade, 0)
+    avg_grade, pass_rate, enrollment_count = db.session.query(
+        func.avg(grade),
+        func.avg(case((grade >= 60, 1.0), else_=0.0)),
+        func.count(Enrollment.id)
+    ).filter(
+        Enrollment.course_offering_id == course_offering_id,
+        Enrollment.status == 'enrolled'
+    ).one()
     
-    if not enrollments:
+    if not enrollment_count:
         return {}
     
-    avg_grade = sum(e.grade or 0 for e in enrollments) / len(enrollments)
-    pass_rate = sum(1 for e in enrollments if (e.grade or 0) >= 60) / len(enrollments)
-    
-    # Attendance rate
-    total_classes = Attendance.query.filter_by(
-        course_offering_id=course_offering_id
-    ).distinct(Attendance.date).count()
-    if total_classes > 0:
-        attended = Attendance.query.filter_by(
-            course_offering_id=course_offering_id,
-            status='present'
-        ).count()
-        attendance_rate = attended / (total_classes * len(enrollments))
+    # Attendance rate: distinct class dates and present marks in one query
+    attendance = db.session.query(
+        func.count(func.distinct(Attendance.date)).label('classes'),
+        func.coalesce(func.sum(case((Attendance.status == 'present', 1), else_=0)), 0).label('present')
+    ).filter(Attendance.course_offering_id == course_offering_id).one()
+    if attendance.classes > 0:
+        attendance_rate = attendance.present / (attendance.classes * enrollment_count)
     else:
         attendance_rate = 0
     
-    # Submission rate
-    total_assignments = offering.assignments.count()
-    if total_assignments > 0:
-        submitted = Submission.query.join(Assignment).filter(
-            Assignment.course_offering_id == course_offering_id
-        ).count()
-        submission_rate = submitted / (total_assignments * len(enrollments))
+    # Submission rate: assignments and their submissions in one query
+    work = db.session.query(
+        func.count(func.distinct(Assignment.id)).label('assignments'),
+        func.count(Submission.id).label('submitted')
+    ).outerjoin(Submission, Submission.assignment_id == Assignment.id).filter(
+        Assignment.course_offering_id == course_offering_id
+    ).one()
+    if work.assignments > 0:
+        submission_rate = work.submitted / (work.assignments * enrollment_count)
     else:
         submission_rate = 0
     
     return {
-        'avg_grade': avg_grade,
-        'pass_rate': pass_rate,
+        'avg_grade': float(avg_grade),
+        'pass_rate': float(pass_rate),
         'attendance_rate': attendance_rate,
         'submission_rate': submission_rate,
-        'enrollment_count': len(enrollments)
+        'enrollment_count': enrollment_count
     }
 
 def user_activity(user_id: int, days: int = 30) -> dict:
     """
     Get user activity metrics over last N days.
     """
-    since = datetime.utcnow() - timedelta(days=days)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
     
     # Logins (from audit logs)
     logins = AuditLog.query.filter(
@@ -136,5 +175,39 @@ def user_activity(user_id: int, days: int = 30) -> dict:
         'logins': logins,
         'submissions': submissions,
         'attendance': attendance,
-        'active_days': (datetime.utcnow() - since).days
+        'active_days': (datetime.now(timezone.utc) - since).days
     }
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stale_stats(session, flush_context):
+    """
+    Record course_performance entries made stale by this flush; deleted on
+    commit. Only reads ids already in the session, so it never queries.
+    institution_stats reads a view refreshed every minute and is not cached.
+    """
+    offering_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Enrollment, Attendance)):
+            offering_ids.add(obj.course_offering_id)
+        elif isinstance(obj, Submission):
+            # Resolve through the identity map only; an unloaded assignment
+            # leaves the entry to expire with STATS_CACHE_TIMEOUT
+            assignment = session.identity_map.get(
+                Session.identity_key(Assignment, obj.assignment_id)
+            )
+            if assignment is not None:
+                offering_ids.add(assignment.course_offering_id)
+    offering_ids.discard(None)
+    if offering_ids:
+        stale = session.info.setdefault('stale_stats_keys', set())
+        stale.update(course_performance.make_cache_key(o) for o in offering_ids)
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_stats(session):
+    keys = session.info.pop('stale_stats_keys', None)
+    if keys:
+        cache.delete_many(*keys)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stale_stats(session):
+    session.info.pop('stale_stats_keys', None)
@@ -3,10 +3,75 @@ Grading and grade calculation services.
 """
 from app import db
 from app.models import Enrollment, Assignment, Submission, Grade, AssignmentGroup
+from sqlalchemy import and_, or_, func
+from bisect import bisect_right
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _final_grade_query(course_offering_id: int, enrollment_id: int = None):
+    """
+    Set-based final grade computation for an offering.
+    Yields (enrollment_id, final_grade) for every enrollment with at least one
+    graded submission; weighting and drop-lowest are applied in the database.
+    """
+    has_groups = db.session.query(AssignmentGroup.id).filter(
+        AssignmentGroup.course_offering_id == course_offering_id
+    ).exists()
+    # Offerings without groups are graded as one implicit group of weight 1
+    group_id = func.coalesce(AssignmentGroup.id, 0)
+    ratio = func.coalesce(Submission.grade / func.nullif(Assignment.points_possible, 0), 0)
+
+    graded = db.session.query(
+        Enrollment.id.label('enrollment_id'),
+        group_id.label('group_id'),
+        func.coalesce(AssignmentGroup.weight, 1.0).label('weight'),
+        func.coalesce(AssignmentGroup.drop_lowest, 0).label('drop_lowest'),
+        Submission.grade.label('grade'),
+        Assignment.points_possible.label('points_possible'),
+        func.row_number().over(
+            partition_by=(Enrollment.id, group_id), order_by=ratio
+        ).label('rn')
+    ).join(
+        Assignment, Assignment.course_offering_id == Enrollment.course_offering_id
+    ).join(Submission, and_(
+        Submission.assignment_id == Assignment.id,
+        Submission.user_id == Enrollment.user_id,
+        Submission.grade.isnot(None)
+    )).outerjoin(
+        AssignmentGroup, AssignmentGroup.id == Assignment.group_id
+    ).filter(
+        Enrollment.course_offering_id == course_offering_id,
+        or_(Assignment.group_id.isnot(None), ~has_groups)
+    )
+    if enrollment_id is not None:
+        graded = graded.filter(Enrollment.id == enrollment_id)
+    graded = graded.cte('graded')
+
+    # Lowest drop_lowest rows of each group are excluded
+    kept = graded.c.rn > graded.c.drop_lowest
+    per_group = db.session.query(
+        graded.c.enrollment_id,
+        graded.c.weight,
+        func.coalesce(
+            func.sum(graded.c.grade).filter(kept) /
+            func.nullif(func.sum(graded.c.points_possible).filter(kept), 0),
+            0
+        ).label('group_pct')
+    ).group_by(
+        graded.c.enrollment_id, graded.c.group_id, graded.c.weight
+    ).subquery('per_group')
+
+    return db.session.query(
+        per_group.c.enrollment_id,
+        func.coalesce(
+            func.sum(per_group.c.weight * per_group.c.group_pct) /
+            func.nullif(func.sum(per_group.c.weight), 0) * 100,
+            0
+        ).label('final_grade')
+    ).group_by(per_group.c.enrollment_id)
+
 def calculate_final_grade(enrollment_id: int) -> float:
     """
     Calculate final grade for an enrollment based on assignment groups.
@@ -16,79 +81,28 @@ def calculate_final_grade(enrollment_id: int) -> float:
     if not enrollment:
         return None
 
-    offering = enrollment.course_offering
-    groups = offering.assignment_groups.all()
-    
-    if not groups:
-        # No groups, use average of all submissions?
-        submissions = Submission.query.join(Assignment).filter(
-            Assignment.course_offering_id == offering.id,
-            Submission.user_id == enrollment.user_id,
-            Submission.grade.isnot(None)
-        ).all()
-        if not submissions:
-            enrollment.grade = 0
-            enrollment.letter_grade = 'F'
-            db.session.commit()
-            return 0
-        total = sum(s.grade for s in submissions)
-        possible = sum(s.assignment.points_possible for s in submissions)
-        percentage = (total / possible) * 100 if possible > 0 else 0
-        enrollment.grade = percentage
-        enrollment.letter_grade = percentage_to_letter(percentage)
-        db.session.commit()
-        return percentage
-
-    total_weight = 0
-    weighted_sum = 0
-
-    for group in groups:
-        assignments = group.assignments.all()
-        # Get all submissions for this user in this group
-        group_submissions = Submission.query.filter(
-            Submission.assignment_id.in_([a.id for a in assignments]),
-            Submission.user_id == enrollment.user_id,
-            Submission.grade.isnot(None)
-        ).all()
-        
-        if not group_submissions:
-            continue
-        
-        # Calculate group grade (consider dropping lowest)
-        grades = [(s.grade, s.assignment.points_possible) for s in group_submissions]
-        if group.drop_lowest > 0:
-            # Sort by percentage and drop lowest
-            grades.sort(key=lambda x: x[0]/x[1] if x[1]>0 else 0)
-            grades = grades[group.drop_lowest:]
-        
-        total_points = sum(g[0] for g in grades)
-        total_possible = sum(g[1] for g in grades)
-        group_percentage = (total_points / total_possible) if total_possible > 0 else 0
-        
-        weighted_sum += group_percentage * group.weight
-        total_weight += group.weight
-
-    if total_weight > 0:
-        final_percentage = (weighted_sum / total_weight) * 100
-    else:
-        final_percentage = 0
+    row = _final_grade_query(enrollment.course_offering_id, enrollment_id).first()
+    final_percentage = row.final_grade if row else 0
 
+    # letter_grade is a generated column derived from grade
     enrollment.grade = final_percentage
-    enrollment.letter_grade = percentage_to_letter(final_percentage)
     db.session.commit()
-    
+
     logger.info(f"Final grade calculated for enrollment {enrollment_id}: {final_percentage}%")
     return final_percentage
 
+# Lower bounds of D, C, B, A; bisect_right keeps each bound inclusive
+_BOUNDARIES = (60, 70, 80, 90)
+_LETTERS = ('F', 'D', 'C', 'B', 'A')
+_LETTERS_ARRAY = np.array(_LETTERS)
+
 def percentage_to_letter(percentage: float) -> str:
-    """Convert percentage to letter grade."""
-    if percentage >= 90:
-        return 'A'
-    elif percentage >= 80:
-        return 'B'
-    elif percentage >= 70:
-        return 'C'
-    elif percentage >= 60:
-        return 'D'
-    else:
-        return 'F'
+    """
+    Convert percentage to letter grade.
+    Must stay in sync with the Enrollment.letter_grade generated column.
+    """
+    return _LETTERS[bisect_right(_BOUNDARIES, percentage)]
+
+def percentages_to_letters(percentages: np.ndarray) -> np.ndarray:
+    """Vectorized percentage_to_letter for bulk paths."""
+    return _LETTERS_ARRAY[np.searchsorted(_BOUNDARIES, percentages, side='right')]
@@ -2,15 +2,27 @@
 Notification service for in-app, email, SMS, and real-time.
 """
 from app import celery
+from celery import group
 from app.models import Notification, User
 from app.extensions import db
+from sqlalchemy import insert
 from app.utils.email import send_async_email
 from app.utils.sms import send_sms
-from app.utils.websocket import emit_notification
+from app.services.realtime import emit_notification
 import logging
 
 logger = logging.getLogger(__name__)
 
+NOTIFY_CHUNK_SIZE = 100
+NOTIFY_SHARDS = 8
+
+def _wants(prefs: dict) -> tuple:
+    """Optional channel preferences as (email, sms); in-app is always sent."""
+    return (
+        prefs.get('email_notifications', True),
+        prefs.get('sms_notifications', False) and prefs.get('phone')
+    )
+
 @celery.task
 def notify_user(user_id: int, notification_type: str, data: dict):
     """
@@ -21,46 +33,124 @@ def notify_user(user_id: int, notification_type: str, data: dict):
         logger.warning(f"User {user_id} not found for notification")
         return
 
+    prefs = user.profile or {}
+    email, sms = _wants(prefs)
+    title = data.get('title')
+    text = data.get('text', '')
+
     # Create in-app notification
     notification = Notification(
         user_id=user_id,
         type=notification_type,
         data=data,
-        title=data.get('title', 'Notification'),
+        title=title or 'Notification',
         message=data.get('message', '')
     )
     db.session.add(notification)
     db.session.commit()
     
     # Emit real-time if user connected
-    emit_notification(user_id, notification.to_dict())
+    emit_notification(user_id, {
+        'id': notification.id,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message,
+        'data': data
+    })
     
     # Send email if user has email notifications enabled
-    if user.profile.get('email_notifications', True):
+    if email:
         send_async_email.delay(
             user.email,
-            data.get('title', 'ChangeX Notification'),
+            title or 'ChangeX Notification',
             body_html=data.get('html', ''),
-            body_text=data.get('text', '')
+            body_text=text
         )
 
     # Send SMS if enabled and phone number exists
-    if user.profile.get('sms_notifications', False) and user.profile.get('phone'):
-        send_sms(user.profile['phone'], data.get('text', ''))
+    if sms:
+        send_sms(prefs['phone'], text)
     
     logger.info(f"Notification {notification_type} sent to user {user_id}")
 
+def _notification_payload(notification_type: str, data: dict) -> dict:
+    return {
+        'type': notification_type,
+        'title': data.get('title') or 'Notification',
+        'message': data.get('message', ''),
+        'data': data
+    }
+
+def notify_users_bulk(user_ids: list, notification_type: str, data: dict):
+    """
+    Notify many users at once: one INSERT ... RETURNING for all in-app
+    notifications, a websocket emit per recipient carrying its notification
+    id, and chunked email tasks.
+    """
+    users = db.session.query(User.id, User.email, User.profile).filter(User.id.in_(user_ids)).all()
+    title = data.get('title')
+    message = data.get('message', '')
+    text = data.get('text', '')
+    html = data.get('html', '')
+
+    rows, emails = [], []
+    for user_id, user_email, profile in users:
+        prefs = profile or {}
+        email, sms = _wants(prefs)
+        rows.append({
+            'user_id': user_id,
+            'type': notification_type,
+            'data': data,
+            'title': title or 'Notification',
+            'message': message
+        })
+        if email:
+            emails.append((user_email, title or 'ChangeX Notification', None, None, html, text))
+        if sms:
+            send_sms(prefs['phone'], text)
+
+    if rows:
+        # The ids let clients mark these read and dedupe them against the REST list
+        inserted = db.session.execute(
+            insert(Notification).returning(Notification.id, Notification.user_id), rows
+        ).all()
+        db.session.commit()
+        payload = _notification_payload(notification_type, data)
+        for notification_id, user_id in inserted:
+            emit_notification(user_id, {'id': notification_id, **payload})
+    if emails:
+        send_async_email.chunks(emails, NOTIFY_CHUNK_SIZE).apply_async()
+
+    logger.info(f"Notification {notification_type} sent to {len(users)} users")
+
 @celery.task
 def notify_course(course_offering_id: int, notification_type: str, data: dict, exclude_user_ids: list = None):
     """
     Send notification to all enrolled students in a course.
+    Fan-out is split into shards so several workers build and dispatch in parallel.
+    """
+    group(
+        notify_course_shard.s(
+            course_offering_id, shard_idx, NOTIFY_SHARDS,
+            notification_type, data, exclude_user_ids
+        )
+        for shard_idx in range(NOTIFY_SHARDS)
+    ).apply_async()
+
+@celery.task
+def notify_course_shard(course_offering_id: int, shard_idx: int, num_shards: int,
+                        notification_type: str, data: dict, exclude_user_ids: list = None):
+    """
+    Notify the enrolled students of one shard (Enrollment.id % num_shards == shard_idx).
     """
     from app.models import Enrollment
-    enrollments = Enrollment.query.filter_by(
+    enrolled = Enrollment.query.filter_by(
         course_offering_id=course_offering_id,
         status='enrolled'
-    ).all()
+    ).filter(
+        Enrollment.id % num_shards == shard_idx
+    ).with_entities(Enrollment.user_id).all()
     exclude = set(exclude_user_ids or [])
-    for e in enrollments:
-        if e.user_id not in exclude:
-            notify_user.delay(e.user_id, notification_type, data)
+    user_ids = [user_id for (user_id,) in enrolled if user_id not in exclude]
+    if user_ids:
+        notify_users_bulk(user_ids, notification_type, data)
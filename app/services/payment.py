@@ -3,7 +3,9 @@ Payment processing with Stripe.
 """
 import stripe
 from flask import current_app
+from app.extensions import celery
 from app.models import Payment, db
+from app.services.realtime import emit_notification
 from decimal import Decimal
 import logging
 
@@ -12,33 +14,70 @@ logger = logging.getLogger(__name__)
 def create_payment_intent(user_id: int, institution_id: int, amount: Decimal, 
                           currency: str = 'usd', description: str = '') -> dict:
     """
-    Create a Stripe PaymentIntent and store payment record.
+    Store a pending payment record and create its Stripe PaymentIntent in the
+    background. The client_secret is pushed to the user as a 'payment_intent'
+    notification once Stripe responds.
     """
+    payment = Payment(
+        user_id=user_id,
+        institution_id=institution_id,
+        amount_cents=int(round(amount * 100)),
+        currency=currency.upper(),
+        description=description,
+        status='pending'
+    )
+    db.session.add(payment)
+    db.session.commit()
+    create_stripe_intent.delay(payment.id)
+    return {
+        'payment_id': payment.id,
+        'status': payment.status
+    }
+
+def _fail_payment(payment: Payment, error: Exception):
+    """Mark a payment failed and tell the user."""
+    logger.error(f"Stripe error: {error}")
+    payment.status = 'failed'
+    db.session.commit()
+    emit_notification(payment.user_id, {
+        'type': 'payment_intent',
+        'payment_id': payment.id,
+        'error': str(error)
+    })
+
+@celery.task(bind=True, max_retries=3)
+def create_stripe_intent(self, payment_id: int):
+    """
+    Create the Stripe PaymentIntent for a pending payment.
+    The idempotency key makes retries return the same intent.
+    """
+    payment = db.session.get(Payment, payment_id)
+    if not payment:
+        logger.warning(f"Payment {payment_id} not found for PaymentIntent")
+        return
     try:
         intent = stripe.PaymentIntent.create(
-            amount=int(amount * 100),  # cents
-            currency=currency.lower(),
-            metadata={'user_id': str(user_id), 'institution_id': str(institution_id)}
+            amount=payment.amount_cents,
+            currency=payment.currency.lower(),
+            metadata={'user_id': str(payment.user_id), 'institution_id': str(payment.institution_id)},
+            idempotency_key=f"pi_{payment.id}"
         )
-        payment = Payment(
-            user_id=user_id,
-            institution_id=institution_id,
-            amount=amount,
-            currency=currency.upper(),
-            stripe_payment_intent_id=intent.id,
-            description=description,
-            status='pending'
-        )
-        db.session.add(payment)
-        db.session.commit()
-        logger.info(f"PaymentIntent created: {intent.id} for user {user_id}")
-        return {
-            'client_secret': intent.client_secret,
-            'payment_id': payment.id
-        }
     except stripe.error.StripeError as e:
-        logger.error(f"Stripe error: {e}")
-        return {'error': str(e)}
+        # With exc set, retry() re-raises e rather than MaxRetriesExceededError
+        # once retries run out, so check the budget here
+        if isinstance(e, stripe.error.APIConnectionError) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries)
+        _fail_payment(payment, e)
+        return
+
+    payment.stripe_payment_intent_id = intent.id
+    db.session.commit()
+    logger.info(f"PaymentIntent created: {intent.id} for user {payment.user_id}")
+    emit_notification(payment.user_id, {
+        'type': 'payment_intent',
+        'payment_id': payment.id,
+        'client_secret': intent.client_secret
+    })
 
 def handle_webhook(payload: bytes, sig: str) -> dict:
     """
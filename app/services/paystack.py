@@ -1,7 +1,17 @@
 """Paystack payment integration for Nigerian institutions."""
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import current_app
 
+# Shared session keeps TLS connections to Paystack alive between calls
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
 
 def initialize_payment(email: str, amount: int, reference: str = None, metadata: dict = None) -> dict:
     """Initialize Paystack transaction."""
@@ -16,7 +26,7 @@ def initialize_payment(email: str, amount: int, reference: str = None, metadata:
         "reference": reference,
         "metadata": metadata
     }
-    response = requests.post(url, json=data, headers=headers)
+    response = _session.post(url, json=data, headers=headers)
     return response.json()
 
 
@@ -24,5 +34,5 @@ def verify_payment(reference: str) -> dict:
     """Verify Paystack transaction."""
     url = f"https://api.paystack.co/transaction/verify/{reference}"
     headers = {"Authorization": f"Bearer {current_app.config['PAYSTACK_SECRET_KEY']}"}
-    response = requests.get(url, headers=headers)
+    response = _session.get(url, headers=headers)
     return response.json()
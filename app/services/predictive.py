@@ -1,90 +1,100 @@
 """
 Predictive analytics using ML models.
 """
-import pickle
+import joblib
 import numpy as np
-from app import cache
 from app.extensions import celery
+from itertools import chain
+from operator import itemgetter
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = os.environ.get('MODEL_PATH', 'models/at_risk_model.pkl')
+MODEL_PATH = os.environ.get('MODEL_PATH', 'models/at_risk_model.joblib')
+
+# Per-process model, reloaded when the file on disk changes
+_MODEL = None
+_MODEL_MTIME = None
+
+# Feature order must match the training matrix columns
+_FEATURE_GETTER = itemgetter('avg_grade', 'submission_rate', 'attendance')
 
 def load_model():
-    """Load the ML model from cache or file."""
-    model = cache.get('risk_model')
-    if model is None:
-        try:
-            with open(MODEL_PATH, 'rb') as f:
-                model = pickle.load(f)
-            cache.set('risk_model', model, timeout=3600)
-            logger.info("Model loaded from disk")
-        except FileNotFoundError:
-            logger.error("Model file not found, using dummy model")
-            # Return a dummy model (always predict 0.1)
-            model = DummyModel()
-    return model
+    """Load the ML model, memory-mapped so worker processes share its pages."""
+    global _MODEL, _MODEL_MTIME
+    try:
+        mtime = os.path.getmtime(MODEL_PATH)
+    except FileNotFoundError:
+        logger.error("Model file not found, using dummy model")
+        # Return a dummy model (always predict 0.1)
+        return DummyModel()
+    if _MODEL is None or mtime != _MODEL_MTIME:
+        _MODEL = joblib.load(MODEL_PATH, mmap_mode='r')
+        _MODEL_MTIME = mtime
+        logger.info("Model loaded from disk")
+    return _MODEL
 
 class DummyModel:
     """Fallback model when real model not available."""
     def predict_proba(self, X):
         return np.array([[0.9, 0.1]] * len(X))
 
-def at_risk_prediction(student_features: list) -> list:
+def at_risk_prediction(student_features, student_ids: list = None) -> list:
     """
     Predict at-risk probability for students.
-    student_features: list of dicts with keys: student_id, avg_grade, submission_rate, attendance
+    student_features: list of dicts with keys: student_id, avg_grade, submission_rate, attendance;
+    or an (N, 3) array of (avg_grade, submission_rate, attendance); student_ids is
+    then required, one per row
     """
     model = load_model()
-    X = np.array([[s['avg_grade'], s['submission_rate'], s['attendance']] 
-                  for s in student_features])
+    if isinstance(student_features, np.ndarray):
+        if student_ids is None or len(student_ids) != len(student_features):
+            raise ValueError("student_ids must match the rows of student_features")
+        X = np.ascontiguousarray(student_features, dtype=np.float32)
+    else:
+        n = len(student_features)
+        X = np.fromiter(
+            chain.from_iterable(map(_FEATURE_GETTER, student_features)),
+            dtype=np.float32, count=n * 3
+        ).reshape(n, 3)
+        student_ids = [s['student_id'] for s in student_features]
     probabilities = model.predict_proba(X)[:, 1]
-    results = []
-    for s, prob in zip(student_features, probabilities):
-        results.append({
-            'student_id': s['student_id'],
-            'risk_score': float(prob)
-        })
-    return results
+    return [
+        {'student_id': student_id, 'risk_score': prob}
+        for student_id, prob in zip(student_ids, probabilities.tolist())
+    ]
 
 @celery.task
 def train_model_async():
     """Background task to train the model."""
     from sklearn.ensemble import RandomForestClassifier
-    import pandas as pd
-    import pickle
-    import os
     
     # Generate training data (in production, fetch from DB)
-    data = generate_training_data()
-    X = data[['avg_grade', 'submission_rate', 'attendance']]
-    y = data['at_risk']
-    model = RandomForestClassifier(n_estimators=100)
+    X, y = generate_training_data()
+    model = RandomForestClassifier(n_estimators=100, n_jobs=-1)
     model.fit(X, y)
     
-    # Save model
+    # Save model uncompressed (compressed files cannot be memory-mapped);
+    # write then rename so loaders never map a partial file
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    with open(MODEL_PATH, 'wb') as f:
-        pickle.dump(model, f)
-    
-    # Update cache
-    cache.set('risk_model', model, timeout=3600)
+    tmp_path = f"{MODEL_PATH}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
     
     logger.info("Model training completed")
     return {'status': 'Model trained'}
 
 def generate_training_data(n=2000):
-    """Generate synthetic training data."""
+    """
+    Generate synthetic training data.
+    Returns (X, y): float32 features (avg_grade, submission_rate, attendance)
+    and int8 at-risk labels.
+    """
     np.random.seed(42)
-    avg_grade = np.random.uniform(40, 100, n)
-    submission_rate = np.random.uniform(0.3, 1.0, n)
-    attendance = np.random.uniform(0.4, 1.0, n)
-    at_risk = ((avg_grade < 60) & ((submission_rate < 0.7) | (attendance < 0.7))).astype(int)
-    return pd.DataFrame({
-        'avg_grade': avg_grade,
-        'submission_rate': submission_rate,
-        'attendance': attendance,
-        'at_risk': at_risk
-    })
+    X = np.empty((n, 3), dtype=np.float32)
+    X[:, 0] = np.random.uniform(40, 100, n)  # avg_grade
+    X[:, 1] = np.random.uniform(0.3, 1.0, n)  # submission_rate
+    X[:, 2] = np.random.uniform(0.4, 1.0, n)  # attendance
+    y = ((X[:, 0] < 60) & ((X[:, 1] < 0.7) | (X[:, 2] < 0.7))).astype(np.int8)
+    return X, y
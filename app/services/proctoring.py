@@ -1,37 +1,119 @@
 """Proctoring analysis and exam management."""
+import struct
 import cv2
 import numpy as np
 import face_recognition
 from app import celery
 from app.models import ProctoringLog, ExamSession, db
+from app.utils.cache import redis_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+PROCTORING_BATCH_SIZE = 64
+PROCTORING_FLUSH_MS = 200
+_FRAME_QUEUE = 'proctoring:frames'
+_FLUSH_SCHEDULED = 'proctoring:flush_scheduled'
+# Queued frames are the exam session id followed by the raw image bytes
+_FRAME_HEADER = struct.Struct('>I')
+# Frames are decoded at 1/4 size for detection
+_DETECT_SCALE = 4
+
+
+def queue_proctoring_frame(exam_session_id: int, image_data: bytes):
+    """
+    Buffer a frame for batched analysis. A batch is dispatched as soon as
+    PROCTORING_BATCH_SIZE frames are queued, or PROCTORING_FLUSH_MS after
+    the first frame of a partial batch.
+    """
+    client = redis_client()
+    if client is None:
+        analyze_proctoring_frame.delay(exam_session_id, image_data)
+        return
+
+    queued = client.rpush(_FRAME_QUEUE, _FRAME_HEADER.pack(exam_session_id) + image_data)
+    if queued % PROCTORING_BATCH_SIZE == 0:
+        analyze_proctoring_batch.delay()
+    elif client.set(_FLUSH_SCHEDULED, 1, nx=True, px=PROCTORING_FLUSH_MS):
+        analyze_proctoring_batch.apply_async(countdown=PROCTORING_FLUSH_MS / 1000)
+
+
+def _drain_frames(client) -> list:
+    """Atomically pop up to PROCTORING_BATCH_SIZE queued frames."""
+    pipe = client.pipeline()
+    pipe.lrange(_FRAME_QUEUE, 0, PROCTORING_BATCH_SIZE - 1)
+    pipe.ltrim(_FRAME_QUEUE, PROCTORING_BATCH_SIZE, -1)
+    items, _ = pipe.execute()
+    size = _FRAME_HEADER.size
+    return [(_FRAME_HEADER.unpack_from(item)[0], item[size:]) for item in items]
+
+
+def _detect_faces(image_data: bytes) -> list:
+    """
+    Return face boxes (top, right, bottom, left) in full-resolution pixels.
+    Detection runs on a 1/4-scale image decoded directly by libjpeg.
+    """
+    nparr = np.frombuffer(image_data, np.uint8)
+    small = cv2.imdecode(nparr, cv2.IMREAD_REDUCED_COLOR_4)
+    if small is None:
+        raise ValueError("frame is not a decodable image")
+    rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    locations = face_recognition.face_locations(rgb, number_of_times_to_upsample=0, model='hog')
+    return [[v * _DETECT_SCALE for v in box] for box in locations]
+
+
+def _store_results(frames: list):
+    """Analyze frames and persist any flagged events with a single INSERT and commit."""
+    sessions = {
+        row.id: row for row in db.session.query(
+            ExamSession.id, ExamSession.exam_id, ExamSession.user_id
+        ).filter(ExamSession.id.in_({sid for sid, _ in frames}))
+    }
+
+    rows = []
+    for exam_session_id, image_data in frames:
+        session = sessions.get(exam_session_id)
+        if session is None:
+            logger.warning(f"Exam session {exam_session_id} not found for proctoring frame")
+            continue
+        # Frames were already popped from the queue; one bad frame must not
+        # cost the rest of the batch
+        try:
+            faces = _detect_faces(image_data)
+        except Exception as e:
+            logger.warning(f"Skipping proctoring frame for exam session {exam_session_id}: {e}")
+            continue
+        num_faces = len(faces)
+        if num_faces == 1:
+            continue
+        rows.append({
+            'exam_id': session.exam_id,
+            'user_id': session.user_id,
+            'event_type': 'no_face' if num_faces == 0 else 'multiple_faces',
+            'metadata': {'num_faces': num_faces, 'faces': faces}
+        })
+
+    if rows:
+        db.session.bulk_insert_mappings(ProctoringLog, rows)
+        db.session.commit()
+
+
+@celery.task
+def analyze_proctoring_batch():
+    """Analyze one batch of buffered frames."""
+    client = redis_client()
+    if client is None:
+        return
+    frames = _drain_frames(client)
+    if not frames:
+        return
+    _store_results(frames)
+    # More frames arrived than one batch holds; keep draining
+    if len(frames) == PROCTORING_BATCH_SIZE and client.llen(_FRAME_QUEUE):
+        analyze_proctoring_batch.delay()
+
 
 @celery.task
 def analyze_proctoring_frame(exam_session_id: int, image_data: bytes, event_type: str = 'frame'):
     """Background task to analyze a frame for faces."""
-    nparr = np.frombuffer(image_data, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    face_locations = face_recognition.face_locations(img)
-    num_faces = len(face_locations)
-
-    if num_faces == 0:
-        log = ProctoringLog(
-            exam_id=exam_session_id,
-            user_id=None,
-            event_type='no_face',
-            metadata={'num_faces': num_faces}
-        )
-        db.session.add(log)
-        db.session.commit()
-    elif num_faces > 1:
-        log = ProctoringLog(
-            exam_id=exam_session_id,
-            user_id=None,
-            event_type='multiple_faces',
-            metadata={'num_faces': num_faces}
-        )
-        db.session.add(log)
-        db.session.commit()
+    _store_results([(exam_session_id, image_data)])
@@ -1,22 +1,21 @@
 """
 Real-time communication via WebSockets.
 """
-from app.extensions import socketio, celery
+from app.extensions import socketio
 from flask_socketio import emit
 import logging
 
 logger = logging.getLogger(__name__)
 
-@celery.task
 def send_course_update(course_offering_id: int, event_type: str, data: dict):
     """
     Send a real-time update to all users in a course room.
+    Called inline: the socketio message queue already fans out across processes.
     """
     room = f"course_{course_offering_id}"
     socketio.emit(event_type, data, room=room)
     logger.info(f"Real-time event {event_type} sent to room {room}")
 
-@celery.task
 def send_user_notification(user_id: int, notification: dict):
     """
     Send a real-time notification to a specific user.
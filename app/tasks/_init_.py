@@ -3,7 +3,7 @@ Celery tasks package – imports all task modules to ensure they are registered.
 """
 from .email_tasks import send_async_email
 from .model_training import train_model
-from .report_tasks import generate_institution_report
+from .report_tasks import generate_institution_report, refresh_institution_stats
 from .monitoring import heartbeat
 
 # Import the modules so Celery discovers the tasks
@@ -13,5 +13,6 @@ __all__ = [
     'send_async_email',
     'train_model',
     'generate_institution_report',
+    'refresh_institution_stats',
     'heartbeat',
 ]
@@ -1,5 +1,26 @@
 from app import celery
-from app.services.analytics import generate_report
+from app.extensions import db
+from sqlalchemy import text
+import logging
+
+logger = logging.getLogger(__name__)
+
+INSTITUTION_STATS_REFRESH_SECONDS = 60
+
+@celery.on_after_configure.connect
+def setup_periodic_tasks(sender, **kwargs):
+    sender.add_periodic_task(
+        INSTITUTION_STATS_REFRESH_SECONDS,
+        refresh_institution_stats.s(),
+        name='refresh institution_stats_mv'
+    )
+
+@celery.task
+def refresh_institution_stats():
+    """Refresh the institution stats materialized view without blocking readers."""
+    db.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY institution_stats_mv"))
+    db.session.commit()
+    logger.info("institution_stats_mv refreshed")
 
 @celery.task
 def generate_institution_report(institution_id, report_type):
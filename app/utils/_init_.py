@@ -2,8 +2,9 @@
 Utilities package – exposes helper functions.
 """
 from .cache import cached, invalidate_cache
+from .lookups import get_role_id, get_role_permissions, is_feature_enabled
 from .validators import validate_email, validate_password, validate_phone
-from .s3 import upload_file_to_s3, delete_file_from_s3, get_presigned_url
+from .s3 import upload_file_to_s3, delete_file_from_s3, delete_files_from_s3, get_presigned_url
 from .email import send_email, send_async_email
 from .sms import send_sms
 from .logging import configure_logging
@@ -15,11 +16,15 @@ from .websocket import emit_notification  # Note: this re‑exports from realtim
 __all__ = [
     'cached',
     'invalidate_cache',
+    'get_role_id',
+    'get_role_permissions',
+    'is_feature_enabled',
     'validate_email',
     'validate_password',
     'validate_phone',
     'upload_file_to_s3',
     'delete_file_from_s3',
+    'delete_files_from_s3',
     'get_presigned_url',
     'send_email',
     'send_async_email',
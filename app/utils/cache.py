@@ -5,30 +5,33 @@ from functools import wraps
 from typing import Optional, Any, Callable
 from flask import current_app, request
 from app.extensions import cache
-import hashlib
+import xxhash
 import json
 
+INVALIDATE_BATCH_SIZE = 500
+
 def cache_key(*args, **kwargs) -> str:
     """Generate a cache key from function name and arguments."""
-    key_parts = [str(arg) for arg in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
-    key = ":".join(key_parts)
-    return hashlib.md5(key.encode()).hexdigest()
+    # One repr of the whole call keeps argument boundaries: (1, 23) != (12, 3)
+    return xxhash.xxh3_64_hexdigest(repr((args, sorted(kwargs.items()))).encode())
 
 def cached(timeout: int = 300, key_prefix: str = '', query_string: bool = False):
     """
     Cache decorator with optional query string inclusion.
     """
     def decorator(f: Callable) -> Callable:
-        @wraps(f)
-        def wrapper(*args, **kwargs):
-            # Build cache key
+        # Fixed part of the key is built once at decoration time
+        prefix = f"{key_prefix}:{f.__name__}:"
+
+        def make_cache_key(*args, **kwargs) -> str:
             if query_string:
                 # Include request query string in cache key
-                qs = request.query_string.decode()
-                key_suffix = hashlib.md5(qs.encode()).hexdigest()
-            else:
-                key_suffix = cache_key(*args, **kwargs)
-            cache_key_full = f"{key_prefix}:{f.__name__}:{key_suffix}"
+                return prefix + xxhash.xxh3_64_hexdigest(request.query_string)
+            return prefix + cache_key(*args, **kwargs)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            cache_key_full = make_cache_key(*args, **kwargs)
             
             # Try cache
             result = cache.get(cache_key_full)
@@ -36,15 +39,28 @@ def cached(timeout: int = 300, key_prefix: str = '', query_string: bool = False)
                 result = f(*args, **kwargs)
                 cache.set(cache_key_full, result, timeout=timeout)
             return result
+        # Lets writers compute the exact key to delete
+        wrapper.make_cache_key = make_cache_key
         return wrapper
     return decorator
 
+def redis_client():
+    """Return the raw Redis client behind the cache, or None for non-Redis backends."""
+    return getattr(cache.cache, '_write_client', None)
+
 def invalidate_cache(pattern: str):
     """Invalidate all cache keys matching pattern."""
-    # Note: Redis doesn't support pattern deletion directly, but we can scan
-    import redis
-    from app.extensions import cache
-    if isinstance(cache.cache, redis.Redis):
-        keys = cache.cache.keys(pattern)
-        if keys:
-            cache.cache.delete(*keys)
+    client = redis_client()
+    if client is None:
+        return
+    # SCAN iterates incrementally instead of blocking the server like KEYS;
+    # UNLINK frees the values in a background thread
+    prefix = cache.cache.key_prefix or ''
+    batch = []
+    for key in client.scan_iter(match=f"{prefix}{pattern}", count=INVALIDATE_BATCH_SIZE):
+        batch.append(key)
+        if len(batch) >= INVALIDATE_BATCH_SIZE:
+            client.unlink(*batch)
+            batch = []
+    if batch:
+        client.unlink(*batch)
@@ -1,12 +1,18 @@
 """
 GDPR compliance utilities: consent tracking, data anonymization, export.
 """
-from datetime import datetime, timedelta
-from app.extensions import db
-from app.models import GDPRConsent, User
+from datetime import datetime, timedelta, timezone
+from app.extensions import db, cache
+from app.models import GDPRConsent, User, Enrollment, CourseOffering, Submission
+from sqlalchemy.orm import selectinload
+from typing import Iterator
 import json
 import csv
-from io import StringIO
+
+CONSENT_CACHE_TIMEOUT = 3600
+
+def _consent_cache_key(user_id: int, consent_type: str) -> str:
+    return f"consent:{user_id}:{consent_type}"
 
 def record_consent(user_id: int, consent_type: str, given: bool, ip: str = None, user_agent: str = None):
     """Record a consent action."""
@@ -16,22 +22,36 @@ def record_consent(user_id: int, consent_type: str, given: bool, ip: str = None,
         given=given,
         ip_address=ip,
         user_agent=user_agent,
-        expires_at=datetime.utcnow() + timedelta(days=365) if given else None
+        expires_at=datetime.now(timezone.utc) + timedelta(days=365) if given else None
     )
     db.session.add(consent)
     db.session.commit()
+    cache.delete(_consent_cache_key(user_id, consent_type))
 
 def get_user_consent(user_id: int, consent_type: str) -> bool:
-    """Check if user has given valid consent."""
+    """Check if user has given valid consent (cached until the consent expires)."""
+    key = _consent_cache_key(user_id, consent_type)
+    valid = cache.get(key)
+    if valid is not None:
+        return valid
+
     latest = GDPRConsent.query.filter_by(
         user_id=user_id,
         consent_type=consent_type
     ).order_by(GDPRConsent.created_at.desc()).first()
+    now = datetime.now(timezone.utc)
+    timeout = CONSENT_CACHE_TIMEOUT
     if not latest:
-        return False
-    if latest.expires_at and latest.expires_at < datetime.utcnow():
-        return False
-    return latest.given
+        valid = False
+    elif latest.expires_at and latest.expires_at < now:
+        valid = False
+    else:
+        valid = latest.given
+        if latest.expires_at:
+            # Never serve a cached True past the consent's expiry
+            timeout = max(1, min(timeout, int((latest.expires_at - now).total_seconds())))
+    cache.set(key, valid, timeout=timeout)
+    return valid
 
 def anonymize_user(user_id: int):
     """Anonymize a user's personal data (for deletion requests)."""
@@ -44,40 +64,49 @@ def anonymize_user(user_id: int):
     # Optionally delete related data? Keep for analytics but anonymized.
     db.session.commit()
 
-def export_user_data(user_id: int) -> str:
-    """Export all user data as CSV."""
-    user = User.query.get(user_id)
+class _Echo:
+    """File-like sink that hands each CSV row straight back to the caller."""
+    def write(self, value):
+        return value
+
+def export_user_data(user_id: int) -> Iterator[str]:
+    """
+    Export all user data as CSV, yielded row by row so it can be streamed:
+    Response(stream_with_context(export_user_data(user_id)), mimetype='text/csv')
+    """
+    user = User.query.options(
+        selectinload(User.enrollments).joinedload(Enrollment.course_offering).joinedload(CourseOffering.course),
+        selectinload(User.submissions).joinedload(Submission.assignment),
+        selectinload(User.payments)
+    ).filter_by(id=user_id).first()
     if not user:
-        return ""
+        return
     
-    output = StringIO()
-    writer = csv.writer(output)
+    writer = csv.writer(_Echo())
     
     # User profile
-    writer.writerow(['Field', 'Value'])
-    writer.writerow(['Email', user.email])
-    writer.writerow(['Full Name', user.full_name])
-    writer.writerow(['Created At', user.created_at])
+    yield writer.writerow(['Field', 'Value'])
+    yield writer.writerow(['Email', user.email])
+    yield writer.writerow(['Full Name', user.full_name])
+    yield writer.writerow(['Created At', user.created_at])
     
     # Enrollments
-    writer.writerow([])
-    writer.writerow(['Enrollments'])
-    writer.writerow(['Course', 'Status', 'Grade'])
+    yield writer.writerow([])
+    yield writer.writerow(['Enrollments'])
+    yield writer.writerow(['Course', 'Status', 'Grade'])
     for e in user.enrollments:
-        writer.writerow([e.course_offering.course.title, e.status, e.grade])
+        yield writer.writerow([e.course_offering.course.title, e.status, e.grade])
     
     # Submissions
-    writer.writerow([])
-    writer.writerow(['Submissions'])
-    writer.writerow(['Assignment', 'Submitted', 'Grade'])
+    yield writer.writerow([])
+    yield writer.writerow(['Submissions'])
+    yield writer.writerow(['Assignment', 'Submitted', 'Grade'])
     for s in user.submissions:
-        writer.writerow([s.assignment.title, s.submitted_at, s.grade])
+        yield writer.writerow([s.assignment.title, s.submitted_at, s.grade])
     
     # Payments
-    writer.writerow([])
-    writer.writerow(['Payments'])
-    writer.writerow(['Amount', 'Status', 'Date'])
+    yield writer.writerow([])
+    yield writer.writerow(['Payments'])
+    yield writer.writerow(['Amount', 'Status', 'Date'])
     for p in user.payments:
-        writer.writerow([p.amount, p.status, p.created_at])
-    
-    return output.getvalue()
+        yield writer.writerow([p.amount, p.status, p.created_at])
@@ -0,0 +1,56 @@
+"""
+Side effects deferred until the current transaction commits.
+Inside a request they run once the response has been sent, so broker and
+websocket round-trips stay off the response path; elsewhere they run
+right after the commit. A rollback discards them.
+"""
+from functools import partial
+from typing import Callable
+from flask import after_this_request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'on_commit'
+
+
+def on_commit(fn: Callable, *args, **kwargs):
+    """Run fn(*args, **kwargs) after the current db.session transaction commits."""
+    db.session.info.setdefault(_PENDING_KEY, []).append(partial(fn, *args, **kwargs))
+
+
+def _run(callbacks: list):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            logger.exception(f"Deferred callback {callback.func!r} failed")
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_on_commit(session):
+    callbacks = session.info.pop(_PENDING_KEY, None)
+    if not callbacks:
+        return
+    if not has_request_context():
+        _run(callbacks)
+        return
+
+    app = current_app._get_current_object()
+
+    def run_in_app_context():
+        with app.app_context():
+            _run(callbacks)
+
+    @after_this_request
+    def _defer(response):
+        response.call_on_close(run_in_app_context)
+        return response
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_commit(session):
+    session.info.pop(_PENDING_KEY, None)
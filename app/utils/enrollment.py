@@ -1,91 +1,292 @@
 """
 Enrollment business logic.
 """
+from typing import Optional
 from app import db
-from app.models import Enrollment, CourseOffering, Waitlist, Course
+from app.extensions import cache
+from app.utils.cache import redis_client
+from app.utils.deferred import on_commit
+from app.models import Enrollment, CourseOffering, Waitlist, Course, course_prerequisites
 from app.services.notification import notify_user
 from app.services.realtime import send_course_update
-from sqlalchemy import and_
+from sqlalchemy import and_, select, update, exists, event, inspect, func
+from sqlalchemy.exc import IntegrityError
 import logging
 
 logger = logging.getLogger(__name__)
 
+OFFERING_META_TIMEOUT = 300
+SEATS_COUNTER_TIMEOUT = 3600
+
+# Decrement the seat counter only while seats remain.
+# Returns seats left after the claim, -1 when full, -2 when the key is unset.
+_CLAIM_SEAT_LUA = """
+local seats = redis.call('GET', KEYS[1])
+if not seats then return -2 end
+if tonumber(seats) > 0 then return redis.call('DECR', KEYS[1]) end
+return -1
+"""
+
+def _offering_meta_key(offering_id: int) -> str:
+    return f"offering:{offering_id}:meta"
+
+def get_offering_meta(offering_id: int) -> Optional[dict]:
+    """
+    Rarely-changing offering metadata (capacity, course, prerequisite ids),
+    cached in Redis. Returns None if the offering does not exist.
+    """
+    key = _offering_meta_key(offering_id)
+    meta = cache.get(key)
+    if meta is None:
+        row = db.session.query(
+            CourseOffering.capacity, Course.id, Course.code, Course.title
+        ).join(Course, Course.id == CourseOffering.course_id).filter(
+            CourseOffering.id == offering_id
+        ).first()
+        if row is None:
+            return None
+        prereq_ids = db.session.query(course_prerequisites.c.prerequisite_id).filter(
+            course_prerequisites.c.course_id == row.id
+        ).all()
+        meta = {
+            'capacity': row.capacity,
+            'course_id': row.id,
+            'course_code': row.code,
+            'course_title': row.title,
+            'prereq_ids': [pid for (pid,) in prereq_ids]
+        }
+        cache.set(key, meta, timeout=OFFERING_META_TIMEOUT)
+    return meta
+
+def _seats_key(offering_id: int) -> str:
+    return f"offering:{offering_id}:seats"
+
+# Script object for _CLAIM_SEAT_LUA, registered once per Redis client
+_claim_script = None
+
+def _get_claim_script(client):
+    global _claim_script
+    if _claim_script is None or _claim_script.registered_client is not client:
+        _claim_script = client.register_script(_CLAIM_SEAT_LUA)
+    return _claim_script
+
+def _drop_seats_counter(offering_id: int):
+    client = redis_client()
+    if client is not None:
+        client.delete(_seats_key(offering_id))
+
+def _claim_seat(offering_id: int) -> Optional[bool]:
+    """
+    Atomically take one seat from the Redis counter, seeding it from the
+    database on first use. Returns None when no Redis backend is configured.
+    """
+    client = redis_client()
+    if client is None:
+        return None
+    claim = _get_claim_script(client)
+    key = _seats_key(offering_id)
+    result = claim(keys=[key])
+    if result == -2:
+        row = db.session.query(CourseOffering.capacity, CourseOffering.enrolled_count).filter(
+            CourseOffering.id == offering_id
+        ).first()
+        remaining = max(row.capacity - row.enrolled_count, 0) if row else 0
+        client.set(key, remaining, nx=True, ex=SEATS_COUNTER_TIMEOUT)
+        result = claim(keys=[key])
+    return result >= 0
+
+def _release_seat(offering_id: int, seat: Optional[bool]):
+    """Return a claimed seat to the Redis counter."""
+    if seat:
+        redis_client().incr(_seats_key(offering_id))
+
+def _add_to_waitlist(user_id: int, offering_id: int, course_title: str) -> dict:
+    # Duplicate enrollments are otherwise rejected by the unique_enrollment
+    # constraint; only the waitlist path has to check explicitly
+    already_enrolled = db.session.query(Enrollment.query.filter_by(
+        user_id=user_id, 
+        course_offering_id=offering_id
+    ).exists()).scalar()
+    if already_enrolled:
+        return {'error': 'Already enrolled', 'code': 400}
+    # Add to waitlist
+    waitlist_entry = Waitlist(
+        user_id=user_id, 
+        course_offering_id=offering_id
+    )
+    db.session.add(waitlist_entry)
+    # Notify once the waitlist entry is committed
+    on_commit(
+        notify_user.delay,
+        user_id, 
+        'waitlist_added', 
+        {'offering_id': offering_id, 'course': course_title}
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {'error': 'Already on waitlist', 'code': 400}
+    logger.info(f"User {user_id} added to waitlist for offering {offering_id}")
+    return {'message': 'Course full, added to waitlist', 'waitlist': True}
+
 def enroll_student(user_id: int, offering_id: int) -> dict:
     """
     Enroll a student in a course offering.
     Handles prerequisites, capacity, waitlist.
     """
-    offering = db.session.get(CourseOffering, offering_id)
-    if not offering:
+    meta = get_offering_meta(offering_id)
+    if not meta:
         return {'error': 'Offering not found', 'code': 404}
+    course_title = meta['course_title']
 
-    # Check if already enrolled
-    existing = Enrollment.query.filter_by(
-        user_id=user_id, 
-        course_offering_id=offering_id
-    ).first()
-    if existing:
-        return {'error': 'Already enrolled', 'code': 400}
+    # Check prerequisites (before taking the row lock)
+    if meta['prereq_ids']:
+        # Any prerequisite without a passing completed enrollment for the user
+        missing = db.session.execute(
+            select(1).where(
+                Course.id.in_(meta['prereq_ids']),
+                ~exists().where(and_(
+                    Enrollment.user_id == user_id,
+                    Enrollment.status == 'completed',
+                    Enrollment.grade >= 60.0,
+                    Enrollment.course_offering_id == CourseOffering.id,
+                    CourseOffering.course_id == Course.id
+                ))
+            ).limit(1)
+        ).first()
+        if missing:
+            logger.warning(f"User {user_id} failed prerequisites for {meta['course_code']}")
+            return {'error': 'Prerequisites not met', 'code': 400}
+
+    # Admission gate: only students who win a Redis seat reach the row lock
+    seat = _claim_seat(offering_id)
+    if seat is False:
+        return _add_to_waitlist(user_id, offering_id, course_title)
 
-    # Check capacity
-    enrolled_count = Enrollment.query.filter_by(
-        course_offering_id=offering_id, 
-        status='enrolled'
-    ).count()
-    if enrolled_count >= offering.capacity:
-        # Add to waitlist
-        waitlist_entry = Waitlist(
+    try:
+        # Take a seat with one conditional UPDATE; the updated row stays locked
+        # until commit, and no row comes back when the offering is full
+        taken = db.session.execute(
+            update(CourseOffering).where(
+                CourseOffering.id == offering_id,
+                CourseOffering.enrolled_count < CourseOffering.capacity
+            ).values(
+                enrolled_count=CourseOffering.enrolled_count + 1
+            ).returning(CourseOffering.enrolled_count).execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if taken is None:
+            # The database stays authoritative if the Redis counter drifts
+            db.session.rollback()
+            return _add_to_waitlist(user_id, offering_id, course_title)
+
+        # Enroll
+        enrollment = Enrollment(
             user_id=user_id, 
-            course_offering_id=offering_id
+            course_offering_id=offering_id, 
+            status='enrolled'
         )
-        db.session.add(waitlist_entry)
-        db.session.commit()
-        logger.info(f"User {user_id} added to waitlist for offering {offering_id}")
-        # Notify
-        notify_user.delay(
+        db.session.add(enrollment)
+        # Notifications go out once the enrollment is committed
+        on_commit(
+            notify_user.delay,
             user_id, 
-            'waitlist_added', 
-            {'offering_id': offering_id, 'course': offering.course.title}
+            'enrollment_success', 
+            {'offering_id': offering_id, 'course': course_title}
         )
-        return {'message': 'Course full, added to waitlist', 'waitlist': True}
-
-    # Check prerequisites
-    course = offering.course
-    if course.prerequisites:
-        # Get completed courses for user (grades >= passing)
-        completed = Enrollment.query.filter(
-            Enrollment.user_id == user_id,
-            Enrollment.status == 'completed',
-            Enrollment.grade >= 60.0
-        ).join(CourseOffering).join(Course).with_entities(Course.id).all()
-        completed_ids = {c[0] for c in completed}
-        prereq_ids = {p.id for p in course.prerequisites}
-        if not prereq_ids.issubset(completed_ids):
-            logger.warning(f"User {user_id} failed prerequisites for {course.code}")
-            return {'error': 'Prerequisites not met', 'code': 400}
-
-    # Enroll
-    enrollment = Enrollment(
-        user_id=user_id, 
-        course_offering_id=offering_id, 
-        status='enrolled'
-    )
-    db.session.add(enrollment)
-    db.session.commit()
+        # Real-time update to course room
+        on_commit(
+            send_course_update,
+            offering_id, 
+            'enrollment_change', 
+            {'user_id': user_id, 'status': 'enrolled'}
+        )
+        # Commit releases the row lock
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # unique_enrollment: the student already has an enrollment row;
+            # the rollback also undoes the seat increment
+            db.session.rollback()
+            _release_seat(offering_id, seat)
+            return {'error': 'Already enrolled', 'code': 400}
+    except Exception:
+        db.session.rollback()
+        _release_seat(offering_id, seat)
+        raise
 
     logger.info(f"User {user_id} enrolled in offering {offering_id}")
 
-    # Send notifications
-    notify_user.delay(
-        user_id, 
-        'enrollment_success', 
-        {'offering_id': offering_id, 'course': offering.course.title}
-    )
-    # Real-time update to course room
-    send_course_update.delay(
-        offering_id, 
-        'enrollment_change', 
-        {'user_id': user_id, 'status': 'enrolled'}
+    return {'enrollment_id': enrollment.id}
+
+def recount_enrolled(offering_ids: Optional[list] = None) -> int:
+    """
+    Recompute CourseOffering.enrolled_count from the enrollments table and
+    drop the matching Redis seat counters. Backfills the column and repairs
+    drift; returns the number of offerings updated.
+    """
+    enrolled = select(func.count(Enrollment.id)).where(
+        Enrollment.course_offering_id == CourseOffering.id,
+        Enrollment.status == 'enrolled'
+    ).scalar_subquery()
+    stmt = update(CourseOffering).values(enrolled_count=enrolled)
+    if offering_ids is not None:
+        stmt = stmt.where(CourseOffering.id.in_(offering_ids))
+    ids = db.session.execute(
+        stmt.returning(CourseOffering.id).execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.session.commit()
+    client = redis_client()
+    if client is not None and ids:
+        client.delete(*[_seats_key(oid) for oid in ids])
+    return len(ids)
+
+def _adjust_enrolled_count(connection, offering_id: int, delta: int):
+    connection.execute(
+        update(CourseOffering.__table__).where(
+            CourseOffering.__table__.c.id == offering_id
+        ).values(enrolled_count=CourseOffering.__table__.c.enrolled_count + delta)
     )
+    # Reseeded from the new count on the next claim
+    on_commit(_drop_seats_counter, offering_id)
 
-    return {'enrollment_id': enrollment.id}
+@event.listens_for(Enrollment, 'after_update')
+def _track_enrollment_status(mapper, connection, target):
+    # enroll_student counts new enrollments itself; this covers drops,
+    # completions and re-enrollments of existing rows
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    was_enrolled = bool(history.deleted) and history.deleted[0] == 'enrolled'
+    delta = (target.status == 'enrolled') - was_enrolled
+    if delta:
+        _adjust_enrolled_count(connection, target.course_offering_id, delta)
+
+@event.listens_for(Enrollment, 'after_delete')
+def _untrack_deleted_enrollment(mapper, connection, target):
+    if target.status == 'enrolled':
+        _adjust_enrolled_count(connection, target.course_offering_id, -1)
+
+@event.listens_for(CourseOffering, 'after_update')
+def _invalidate_offering_meta(mapper, connection, target):
+    # enrolled_count changes on every enrollment; only cached fields matter
+    state = inspect(target)
+    if state.attrs.capacity.history.has_changes() or state.attrs.course_id.history.has_changes():
+        # Dropped once the change commits, so a concurrent enrollment cannot
+        # re-cache or reseed from the old row in between; the counter is
+        # reseeded from the new capacity on the next enrollment
+        on_commit(cache.delete, _offering_meta_key(target.id))
+        on_commit(_drop_seats_counter, target.id)
+
+@event.listens_for(CourseOffering, 'after_delete')
+def _drop_offering_meta(mapper, connection, target):
+    on_commit(cache.delete, _offering_meta_key(target.id))
+
+@event.listens_for(Course, 'after_update')
+@event.listens_for(Course, 'after_delete')
+def _invalidate_course_offerings_meta(mapper, connection, target):
+    offering_ids = connection.execute(
+        select(CourseOffering.id).where(CourseOffering.course_id == target.id)
+    ).scalars().all()
+    if offering_ids:
+        on_commit(cache.delete_many, *[_offering_meta_key(oid) for oid in offering_ids])
@@ -1,30 +1,131 @@
 """
 Structured logging configuration.
 """
+import atexit
+import copy
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
 import json
 import sys
+import time
+import orjson
 from flask import request, has_request_context
 from pythonjsonlogger import jsonlogger
-from datetime import datetime
+
+_default_encoder = jsonlogger.JsonEncoder()
+
+def _dumps(obj, **kw) -> str:
+    """orjson-backed json_serializer; falls back to JsonEncoder for unsupported types."""
+    return orjson.dumps(
+        obj,
+        default=kw.get('default') or _default_encoder.default,
+        option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+# (epoch second, 'YYYY-MM-DDTHH:MM:SS') of the last formatted timestamp
+_timestamp_base = (None, '')
+
+def _utc_timestamp(created: float) -> str:
+    """ISO-8601 UTC timestamp; the date/time part is formatted once per second."""
+    global _timestamp_base
+    second = int(created)
+    base_second, base = _timestamp_base
+    if second != base_second:
+        base = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_base = (second, base)
+    return f"{base}.{int((created - second) * 1e6):06d}"
+
+def _request_info() -> dict:
+    # Resolve the proxy once; read raw environ values where possible
+    req = request._get_current_object()
+    environ = req.environ
+    return {
+        'ip': req.remote_addr,
+        'method': environ.get('REQUEST_METHOD'),
+        'path': req.path,
+        'user_agent': environ.get('HTTP_USER_AGENT', ''),
+    }
+
+class _RequestInfoFilter(logging.Filter):
+    """Attach request details to the record before it leaves the request thread."""
+    def filter(self, record):
+        if has_request_context():
+            record.request_info = _request_info()
+        return True
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener's handlers.
+    The stock prepare() renders the record with a plain Formatter and drops
+    exc_info, which would flatten tracebacks in the JSON output.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        # Bind the arguments now; they may be mutated after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """Custom JSON formatter with extra fields."""
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('json_serializer', _dumps)
+        super().__init__(*args, **kwargs)
+
     def add_fields(self, log_record, record, message_dict):
         super().add_fields(log_record, record, message_dict)
         if not log_record.get('timestamp'):
-            log_record['timestamp'] = datetime.utcnow().isoformat()
-        if has_request_context():
-            log_record['ip'] = request.remote_addr
-            log_record['method'] = request.method
-            log_record['path'] = request.path
-            log_record['user_agent'] = request.user_agent.string
+            log_record['timestamp'] = _utc_timestamp(record.created)
+        # Captured on the logging thread by _RequestInfoFilter, since formatting
+        # runs on the queue listener thread outside the request. super() has
+        # copied it in as a nested extra; flatten it instead
+        info = log_record.pop('request_info', None)
+        if info is None and has_request_context():
+            info = _request_info()
+        if info:
+            log_record.update(info)
         log_record['level'] = record.levelname
         log_record['logger'] = record.name
 
+# Queue pipeline of this process; configure_logging replaces it, and the
+# exit and fork hooks below are registered once against it
+_queue_handler = None
+_listener = None
+_listener_app = None
+
+def _start_listener(queue_handler, handlers):
+    global _queue_handler, _listener
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _queue_handler, _listener = queue_handler, listener
+    return listener
+
+def _stop_listener():
+    # QueueListener.stop() raises when called on a stopped listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+def _restart_listener_in_child():
+    # Forked workers (Celery prefork) do not inherit the listener thread;
+    # give the child its own queue and listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    listener = _start_listener(_queue_handler, _listener.handlers)
+    if _listener_app is not None:
+        _listener_app.extensions['log_listener'] = listener
+
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_listener_in_child)
+
 def configure_logging(app):
     """Configure logging for the application."""
+    global _listener_app
     log_level = app.config.get('LOG_LEVEL', 'INFO')
     log_format = app.config.get('LOG_FORMAT', 'json')
     log_file = app.config.get('LOG_FILE')
@@ -48,8 +149,21 @@ def configure_logging(app):
         file_handler.setFormatter(formatter)
         handlers.append(file_handler)
     
+    # Handlers do their blocking writes on a listener thread; callers only
+    # pay for a queue put
+    previous = _listener
+    _stop_listener()
+    if previous is not None:
+        for handler in previous.handlers:
+            handler.close()
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(_RequestInfoFilter())
+    _listener_app = app
+    app.extensions['log_listener'] = _start_listener(queue_handler, handlers)
+
     # Configure root logger
-    logging.basicConfig(level=log_level, handlers=handlers)
+    # force replaces the queue handler of any earlier configure_logging call
+    logging.basicConfig(level=log_level, handlers=[queue_handler], force=True)
     
     # Set levels for third-party libraries
     logging.getLogger('werkzeug').setLevel(log_level)
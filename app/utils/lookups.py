@@ -0,0 +1,79 @@
+"""
+Cached lookups for small, rarely-changing tables (roles, feature flags).
+Backed by the shared Redis cache so all workers see the same values;
+entries are dropped whenever a write to a Role or FeatureFlag row commits.
+"""
+from typing import List, Optional
+from flask import current_app
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session, object_session
+from app.extensions import cache, db
+from app.models import Role, FeatureFlag
+
+LOOKUP_CACHE_TIMEOUT = 300
+
+
+@cache.memoize(timeout=LOOKUP_CACHE_TIMEOUT)
+def get_role_id(name: str) -> Optional[int]:
+    """Return the id of the role with the given name."""
+    return db.session.query(Role.id).filter(Role.name == name).scalar()
+
+
+@cache.memoize(timeout=LOOKUP_CACHE_TIMEOUT)
+def get_role_permissions(role_id: int) -> List[str]:
+    """Return the permission strings granted by a role."""
+    permissions = db.session.query(Role.permissions).filter(Role.id == role_id).scalar()
+    return list(permissions or [])
+
+
+@cache.memoize(timeout=LOOKUP_CACHE_TIMEOUT)
+def is_feature_enabled(name: str, institution_id: Optional[int] = None) -> bool:
+    """
+    Check a feature flag. An institution-specific flag overrides the
+    global one (institution_id NULL), which overrides FEATURE_FLAGS config.
+    """
+    flags = dict(db.session.query(FeatureFlag.institution_id, FeatureFlag.enabled).filter(
+        FeatureFlag.name == name,
+        or_(FeatureFlag.institution_id == institution_id, FeatureFlag.institution_id.is_(None))
+    ).all())
+    if institution_id is not None and institution_id in flags:
+        return flags[institution_id]
+    if None in flags:
+        return flags[None]
+    return current_app.config['FEATURE_FLAGS'].get(name, False)
+
+
+_STALE_KEY = 'stale_lookups'
+
+
+@event.listens_for(Role, 'after_insert')
+@event.listens_for(Role, 'after_update')
+@event.listens_for(Role, 'after_delete')
+def _collect_role_lookups(mapper, connection, target):
+    _mark_stale(target, get_role_id, get_role_permissions)
+
+
+@event.listens_for(FeatureFlag, 'after_insert')
+@event.listens_for(FeatureFlag, 'after_update')
+@event.listens_for(FeatureFlag, 'after_delete')
+def _collect_feature_flag_lookups(mapper, connection, target):
+    _mark_stale(target, is_feature_enabled)
+
+
+def _mark_stale(target, *lookups):
+    # Deleted on commit: dropping them at flush time would let a concurrent
+    # request re-cache the old value before the write is visible
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_STALE_KEY, set()).update(lookups)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_lookups(session):
+    for lookup in session.info.pop(_STALE_KEY, ()):
+        cache.delete_memoized(lookup)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stale_lookups(session):
+    session.info.pop(_STALE_KEY, None)
@@ -3,12 +3,72 @@ Pagination utilities supporting both offset/limit and cursor-based.
 """
 from flask import request, url_for
 from typing import Optional, Any, Dict
+from sqlalchemy import Integer, and_, or_, inspect as sa_inspect
+from app.errors import ValidationError
 import base64
+import binascii
+import struct
+
+# Integer cursors are packed as 8 bytes instead of their decimal string
+_INT_CURSOR = struct.Struct('>q')
+# Separates the cursor value from its primary-key tiebreaker; not in the
+# urlsafe base64 alphabet
+_CURSOR_SEP = '.'
+
+def _encode_part(value: Any) -> str:
+    raw = _INT_CURSOR.pack(value) if isinstance(value, int) else str(value).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_part(part: str, column) -> Any:
+    # validate=True rejects characters outside the urlsafe alphabet instead
+    # of silently dropping them
+    raw = base64.b64decode(part.encode(), altchars=b'-_', validate=True)
+    if isinstance(column.type, Integer):
+        return _INT_CURSOR.unpack(raw)[0]
+    return raw.decode()
+
+def _encode_cursor(value: Any, tiebreaker: Any = None) -> str:
+    if tiebreaker is None:
+        return _encode_part(value)
+    return _encode_part(value) + _CURSOR_SEP + _encode_part(tiebreaker)
+
+def _decode_cursor(cursor: str, column, tiebreaker_column=None):
+    """
+    Decode a cursor for column, or a (value, tiebreaker) pair when
+    tiebreaker_column is given. Raises ValueError on any malformed cursor.
+    """
+    parts = cursor.split(_CURSOR_SEP)
+    try:
+        if tiebreaker_column is None:
+            if len(parts) != 1:
+                raise ValueError("unexpected cursor tiebreaker")
+            return _decode_part(parts[0], column)
+        if len(parts) != 2:
+            raise ValueError("cursor tiebreaker missing")
+        return _decode_part(parts[0], column), _decode_part(parts[1], tiebreaker_column)
+    except (struct.error, binascii.Error) as e:
+        raise ValueError(f"malformed cursor: {e}") from e
+
+def _tiebreaker(entity, cursor_field: str):
+    """Primary-key attribute that orders ties in cursor_field, or None if it is the key."""
+    mapper = sa_inspect(entity)
+    pk = mapper.get_property_by_column(mapper.primary_key[0]).key
+    return None if cursor_field == pk else getattr(entity, pk)
+
+def _next_cursor(row, cursor_field: str, tiebreaker) -> str:
+    value = getattr(row, cursor_field)
+    if tiebreaker is None:
+        return _encode_cursor(value)
+    return _encode_cursor(value, getattr(row, tiebreaker.key))
 
 def paginate(query, schema, endpoint, cursor_field='id', **kwargs):
     """
     Paginate a SQLAlchemy query. Supports both offset/limit and cursor-based.
-    If cursor is provided, use cursor-based pagination.
+    If cursor is provided, use keyset pagination: rows are ordered by
+    cursor_field, then by primary key when cursor_field is not the key, so
+    ties never straddle a page boundary. The query's own ORDER BY does not
+    apply on that path, which also skips the COUNT(*) and returns no
+    total/pages. An invalid cursor is a 400.
     """
     page = request.args.get('page', 1, type=int)
     per_page = min(request.args.get('per_page', 20, type=int), 100)
@@ -16,15 +76,31 @@ def paginate(query, schema, endpoint, cursor_field='id', **kwargs):
     
     if cursor:
         # Cursor-based pagination
+        entity = query.column_descriptions[0]['entity']
+        column = getattr(entity, cursor_field)
+        tiebreaker = _tiebreaker(entity, cursor_field)
         try:
-            cursor_value = base64.urlsafe_b64decode(cursor.encode()).decode()
-            # Assuming cursor is the value of cursor_field
-            if cursor_field == 'id':
-                query = query.filter(getattr(query.entity, cursor_field) > cursor_value)
-            else:
-                query = query.filter(getattr(query.entity, cursor_field) > cursor_value)
-        except Exception:
-            pass
+            position = _decode_cursor(cursor, column, tiebreaker)
+        except ValueError:
+            raise ValidationError('Invalid cursor')
+        if tiebreaker is None:
+            query = query.filter(column > position)
+            order = (column,)
+        else:
+            value, last_id = position
+            query = query.filter(or_(column > value, and_(column == value, tiebreaker > last_id)))
+            order = (column, tiebreaker)
+        # One extra row tells us whether there is a next page
+        rows = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = _next_cursor(rows[-1], cursor_field, tiebreaker) if has_next else None
+        return {
+            'items': schema.dump(rows, many=True),
+            'per_page': per_page,
+            'next': url_for(endpoint, cursor=next_cursor, per_page=per_page, **kwargs) if has_next else None,
+            'next_cursor': next_cursor
+        }
     
     paginated = query.paginate(page=page, per_page=per_page, error_out=False)
     
@@ -35,8 +111,8 @@ def paginate(query, schema, endpoint, cursor_field='id', **kwargs):
     if paginated.has_next:
         last_item = paginated.items[-1]
         if hasattr(last_item, cursor_field):
-            cursor_value = str(getattr(last_item, cursor_field))
-            next_cursor = base64.urlsafe_b64encode(cursor_value.encode()).decode()
+            tiebreaker = _tiebreaker(query.column_descriptions[0]['entity'], cursor_field)
+            next_cursor = _next_cursor(last_item, cursor_field, tiebreaker)
     
     return {
         'items': items,
@@ -2,12 +2,21 @@
 AWS S3 file upload and management.
 """
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from flask import current_app
 from werkzeug.utils import secure_filename
+from app.extensions import cache
 import uuid
 import os
-from typing import Optional, BinaryIO
+import time
+from typing import Optional, BinaryIO, Iterable
+
+# delete_objects accepts at most this many keys per request
+DELETE_BATCH_SIZE = 1000
+# A cached presigned URL is never handed out with less than this left
+PRESIGNED_URL_MIN_REMAINING = 60
 
 class S3Client:
     """Singleton S3 client."""
@@ -24,9 +33,22 @@ class S3Client:
             's3',
             aws_access_key_id=current_app.config['AWS_ACCESS_KEY_ID'],
             aws_secret_access_key=current_app.config['AWS_SECRET_ACCESS_KEY'],
-            region_name=current_app.config['AWS_REGION']
+            region_name=current_app.config['AWS_REGION'],
+            config=Config(
+                # Room for multipart threads and concurrent request workers
+                max_pool_connections=64,
+                retries={'max_attempts': 3, 'mode': 'adaptive'},
+                tcp_keepalive=True
+            )
         )
         self.bucket = current_app.config['AWS_S3_BUCKET']
+        # Large submissions go up as parallel 8MB multipart PUTs
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=8,
+            use_threads=True
+        )
 
     def upload_fileobj(self, file_obj: BinaryIO, folder: str = 'uploads') -> Optional[str]:
         """
@@ -36,12 +58,17 @@ class S3Client:
         filename = secure_filename(getattr(file_obj, 'filename', 'file'))
         unique_id = uuid.uuid4().hex
         key = f"{folder}/{unique_id}_{filename}"
+        extra_args = {'ACL': 'private'}
+        content_type = getattr(file_obj, 'mimetype', None)
+        if content_type:
+            extra_args['ContentType'] = content_type
         try:
             self.client.upload_fileobj(
                 file_obj,
                 self.bucket,
                 key,
-                ExtraArgs={'ACL': 'private'}
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
             )
             # Generate URL (could also use cloudfront)
             url = f"https://{self.bucket}.s3.amazonaws.com/{key}"
@@ -59,14 +86,54 @@ class S3Client:
             current_app.logger.error(f"S3 delete failed: {e}")
             return False
 
+    def delete_files(self, keys: Iterable[str]) -> bool:
+        """
+        Delete many files from S3, up to DELETE_BATCH_SIZE keys per request.
+        Returns False if any key could not be deleted.
+        """
+        keys = list(keys)
+        ok = True
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            chunk = keys[start:start + DELETE_BATCH_SIZE]
+            try:
+                # Quiet mode only reports the keys that failed
+                response = self.client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={'Objects': [{'Key': k} for k in chunk], 'Quiet': True}
+                )
+            except ClientError as e:
+                current_app.logger.error(f"S3 batch delete failed: {e}")
+                ok = False
+                continue
+            for error in response.get('Errors', []):
+                current_app.logger.error(
+                    f"S3 delete failed for {error.get('Key')}: {error.get('Message')}"
+                )
+                ok = False
+        return ok
+
     def generate_presigned_url(self, key: str, expiration: int = 3600) -> Optional[str]:
-        """Generate a presigned URL for temporary access."""
+        """
+        Generate a presigned URL for temporary access.
+        URLs are cached in Redis per half-expiration window, so repeated
+        previews of the same file skip SigV4 signing.
+        """
+        timeout = expiration - PRESIGNED_URL_MIN_REMAINING
+        cache_key = None
+        if timeout > 0:
+            exp_bucket = int(time.time()) // max(expiration // 2, 1)
+            cache_key = f"s3:sig:{self.bucket}:{key}:{exp_bucket}"
+            url = cache.get(cache_key)
+            if url is not None:
+                return url
         try:
             url = self.client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket, 'Key': key},
                 ExpiresIn=expiration
             )
+            if cache_key:
+                cache.set(cache_key, url, timeout=timeout)
             return url
         except ClientError as e:
             current_app.logger.error(f"S3 presigned URL failed: {e}")
@@ -81,5 +148,8 @@ def upload_file_to_s3(file, folder='uploads'):
 def delete_file_from_s3(key):
     return s3_client.delete_file(key)
 
+def delete_files_from_s3(keys):
+    return s3_client.delete_files(keys)
+
 def get_presigned_url(key, expiration=3600):
     return s3_client.generate_presigned_url(key, expiration)
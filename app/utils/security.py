@@ -1,18 +1,30 @@
 """
 Security helpers: CSP nonce, etc.
 """
+import base64
 import secrets
-from flask import request, g
+from flask import request, g, current_app
 
 def generate_nonce():
-    """Generate a random nonce for CSP."""
+    """Generate a random nonce for CSP (empty when no CSP policy is configured)."""
+    if not current_app.config.get('CSP_POLICY'):
+        return ''
     if 'csp_nonce' not in g:
-        g.csp_nonce = secrets.token_urlsafe(16)
+        g.csp_nonce = base64.urlsafe_b64encode(secrets.token_bytes(16)).rstrip(b'=').decode()
     return g.csp_nonce
 
+# HTML-escape table applied in a single pass
+_SANITIZE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#39;'
+})
+
 def sanitize_input(data):
     """Basic input sanitization (can be expanded)."""
     if isinstance(data, str):
-        # Remove any potentially dangerous characters
-        return data.replace('<', '&lt;').replace('>', '&gt;')
+        # Escape potentially dangerous characters
+        return data.translate(_SANITIZE_TABLE)
     return data
@@ -3,10 +3,24 @@ SMS sending with Twilio.
 """
 from twilio.rest import Client
 from flask import current_app
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
+_client_lock = threading.Lock()
+
+def _get_client(account_sid: str, auth_token: str) -> Client:
+    """Per-app Twilio client, built once so its HTTP session keeps connections alive."""
+    client = current_app.extensions.get('twilio')
+    if client is None:
+        with _client_lock:
+            client = current_app.extensions.get('twilio')
+            if client is None:
+                client = Client(account_sid, auth_token)
+                current_app.extensions['twilio'] = client
+    return client
+
 def send_sms(to_number: str, body: str):
     """Send an SMS via Twilio."""
     account_sid = current_app.config.get('TWILIO_ACCOUNT_SID')
@@ -17,7 +31,7 @@ def send_sms(to_number: str, body: str):
         logger.error("Twilio credentials not configured")
         return False
     
-    client = Client(account_sid, auth_token)
+    client = _get_client(account_sid, auth_token)
     try:
         message = client.messages.create(
             body=body,
@@ -2,14 +2,20 @@
 Input validation using Marshmallow schemas and custom validators.
 """
 import re
-from typing import Any, Dict
-from marshmallow import Schema, fields, validate, ValidationError, post_load
+from marshmallow import Schema, fields, validate, EXCLUDE
 from datetime import datetime
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
+# Password character classes seen, as bitflags
+_PW_UPPER = 1
+_PW_LOWER = 2
+_PW_DIGIT = 4
+_PW_ALL = _PW_UPPER | _PW_LOWER | _PW_DIGIT
+
 def validate_email(email: str) -> bool:
     """Validate email format."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_password(password: str) -> bool:
     """
@@ -21,32 +27,38 @@ def validate_password(password: str) -> bool:
     """
     if len(password) < 8:
         return False
-    if not re.search(r'[A-Z]', password):
-        return False
-    if not re.search(r'[a-z]', password):
-        return False
-    if not re.search(r'[0-9]', password):
-        return False
-    return True
+    # Single pass; ASCII ranges match the previous [A-Z]/[a-z]/[0-9] classes
+    flags = 0
+    for c in password:
+        if 'A' <= c <= 'Z':
+            flags |= _PW_UPPER
+        elif 'a' <= c <= 'z':
+            flags |= _PW_LOWER
+        elif '0' <= c <= '9':
+            flags |= _PW_DIGIT
+        else:
+            continue
+        if flags == _PW_ALL:
+            return True
+    return False
 
 def validate_phone(phone: str) -> bool:
     """Basic international phone validation."""
-    pattern = r'^\+?[1-9]\d{1,14}$'
-    return re.match(pattern, phone) is not None
+    return _PHONE_RE.match(phone) is not None
 
 # Marshmallow schemas
 class UserRegistrationSchema(Schema):
     email = fields.Email(required=True)
-    password = fields.Str(required=True, validate=validate.Length(min=8))
+    password = fields.Str(required=True, validate=validate.And(
+        validate.Length(min=8),
+        validate.Regexp(
+            r'(?=.*[A-Z])(?=.*[a-z])(?=.*[0-9])',
+            error='Password must contain at least 8 chars, one uppercase, one lowercase, and one number'
+        )
+    ))
     full_name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     accept_terms = fields.Bool(required=True, validate=validate.Equal(True))
 
-    @post_load
-    def validate_password_strength(self, data: Dict, **kwargs) -> Dict:
-        if not validate_password(data['password']):
-            raise ValidationError('Password must contain at least 8 chars, one uppercase, one lowercase, and one number')
-        return data
-
 class InstitutionCreateSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=1, max=200))
     type = fields.Str(required=True, validate=validate.OneOf(['school', 'university', 'tutoring_center']))
@@ -75,3 +87,9 @@ class AssignmentCreateSchema(Schema):
     max_file_size = fields.Int(missing=10485760)
     late_policy = fields.Str(missing='not_allowed', validate=validate.OneOf(['not_allowed', 'allowed_with_penalty', 'allowed']))
     late_penalty = fields.Float(missing=0.10, validate=validate.Range(min=0, max=1))
+
+# Shared instances; schemas are stateless once built, so build them once
+user_registration_schema = UserRegistrationSchema(unknown=EXCLUDE)
+institution_create_schema = InstitutionCreateSchema(unknown=EXCLUDE)
+course_create_schema = CourseCreateSchema(unknown=EXCLUDE)
+assignment_create_schema = AssignmentCreateSchema(unknown=EXCLUDE)
@@ -3,7 +3,8 @@ WebSocket event handlers for real-time notifications.
 """
 from flask_socketio import emit, join_room, leave_room
 from flask import request, g
-from app.extensions import socketio
+from app.extensions import socketio, db
+from app.models import Enrollment
 from app.auth import jwt_required
 import logging
 
@@ -24,6 +25,13 @@ def handle_authenticate(data):
     """Authenticate socket connection and join user rooms."""
     user_id = g.current_user.id
     join_room(f"user_{user_id}")
+    # Course rooms carry send_course_update events for enrolled offerings
+    enrolled = db.session.query(Enrollment.course_offering_id).filter_by(
+        user_id=user_id,
+        status='enrolled'
+    ).all()
+    for (course_offering_id,) in enrolled:
+        join_room(f"course_{course_offering_id}")
     emit('authenticated', {'msg': 'Authenticated'})
 
 @socketio.on('join_course')
@@ -1,6 +1,13 @@
 import os
 from datetime import timedelta
 from typing import Optional, Dict, Any
+import orjson
+
+
+def _json_serializer(obj: Any) -> str:
+    """orjson-backed encoder for JSON/JSONB columns (engine json_serializer)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 class Config:
     # Flask
@@ -15,9 +22,22 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     SQLALCHEMY_ENGINE_OPTIONS: Dict[str, Any] = {
         'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
         'pool_recycle': 300,
         'pool_pre_ping': True,
-        'max_overflow': 20,
+        # Reuse the most recently returned connection so idle ones age out
+        'pool_use_lifo': True,
+        'connect_args': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 3,
+            'application_name': 'changex-api',
+        },
+        'json_serializer': _json_serializer,
+        'json_deserializer': orjson.loads,
     }
 
     # JWT
@@ -161,6 +181,11 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING: bool = True
     SQLALCHEMY_DATABASE_URI: str = 'sqlite:///:memory:'
+    # SQLite has no connection pool or libpq connect args
+    SQLALCHEMY_ENGINE_OPTIONS: Dict[str, Any] = {
+        'json_serializer': _json_serializer,
+        'json_deserializer': orjson.loads,
+    }
     CACHE_TYPE: str = 'NullCache'
     RATELIMIT_ENABLED: bool = False
     WTF_CSRF_ENABLED: bool = False
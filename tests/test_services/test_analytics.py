@@ -0,0 +1,51 @@
+import pytest
+from app.models import User, Institution, Course, CourseOffering, Enrollment
+from app.services import analytics
+from app.services.analytics import course_performance
+
+class _CacheRecorder:
+    def __init__(self):
+        self.deleted = []
+
+    def delete_many(self, *keys):
+        self.deleted.extend(keys)
+
+@pytest.fixture
+def enrollment(db):
+    institution = Institution(name='Test U')
+    db.session.add(institution)
+    db.session.flush()
+    course = Course(institution_id=institution.id, code='BIO1', title='Biology')
+    db.session.add(course)
+    db.session.flush()
+    offering = CourseOffering(course_id=course.id, term='Fall', year=2024, capacity=10)
+    user = User(email='stats@test.com', full_name='Stats Student')
+    user.password = 'Student123!'
+    db.session.add_all([offering, user])
+    db.session.flush()
+    enrollment = Enrollment(user_id=user.id, course_offering_id=offering.id, status='enrolled')
+    db.session.add(enrollment)
+    db.session.commit()
+    return enrollment
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = _CacheRecorder()
+    monkeypatch.setattr(analytics, 'cache', recorder)
+    return recorder
+
+def test_grade_write_clears_course_performance_after_commit(db, enrollment, recorder):
+    enrollment.grade = 91.0
+    db.session.flush()
+    # Collected at flush, not deleted until the transaction commits
+    assert recorder.deleted == []
+    db.session.commit()
+    assert recorder.deleted == [course_performance.make_cache_key(enrollment.course_offering_id)]
+
+def test_rolled_back_grade_write_keeps_course_performance(db, enrollment, recorder):
+    enrollment.grade = 12.0
+    db.session.flush()
+    db.session.rollback()
+    assert 'stale_stats_keys' not in db.session.info
+    db.session.commit()
+    assert recorder.deleted == []
@@ -0,0 +1,139 @@
+import numpy as np
+from app.services.grading import percentage_to_letter, percentages_to_letters
+
+def test_percentage_to_letter_boundaries():
+    assert percentage_to_letter(100) == 'A'
+    assert percentage_to_letter(90) == 'A'
+    assert percentage_to_letter(89.99) == 'B'
+    assert percentage_to_letter(80) == 'B'
+    assert percentage_to_letter(70) == 'C'
+    assert percentage_to_letter(60) == 'D'
+    assert percentage_to_letter(59.9) == 'F'
+    assert percentage_to_letter(0) == 'F'
+
+def test_percentages_to_letters_matches_scalar():
+    grades = np.array([0, 59.9, 60, 69.5, 70, 80, 89.99, 90, 100])
+    assert list(percentages_to_letters(grades)) == [percentage_to_letter(g) for g in grades]
+
+import pytest
+from app.models import (
+    User, Institution, Course, CourseOffering, Enrollment, Assignment,
+    AssignmentGroup, Submission
+)
+from app.services.grading import calculate_final_grade
+
+def _reference_grade(groups, graded):
+    """
+    The per-enrollment Python computation the SQL query replaced.
+    groups: {name: (weight, drop_lowest)}; graded: [(group name or None, grade, points)]
+    """
+    if not groups:
+        if not graded:
+            return 0
+        possible = sum(points for _, _, points in graded)
+        return sum(grade for _, grade, _ in graded) / possible * 100 if possible > 0 else 0
+    total_weight = weighted_sum = 0
+    for name, (weight, drop_lowest) in groups.items():
+        grades = [(grade, points) for group, grade, points in graded if group == name]
+        if not grades:
+            continue
+        if drop_lowest > 0:
+            grades.sort(key=lambda x: x[0] / x[1] if x[1] > 0 else 0)
+            grades = grades[drop_lowest:]
+        total_possible = sum(g[1] for g in grades)
+        pct = sum(g[0] for g in grades) / total_possible if total_possible > 0 else 0
+        weighted_sum += pct * weight
+        total_weight += weight
+    return weighted_sum / total_weight * 100 if total_weight > 0 else 0
+
+@pytest.fixture
+def offering(db):
+    institution = Institution(name='Test U')
+    db.session.add(institution)
+    db.session.flush()
+    course = Course(institution_id=institution.id, code='MATH1', title='Algebra')
+    db.session.add(course)
+    db.session.flush()
+    offering = CourseOffering(course_id=course.id, term='Fall', year=2024, capacity=10)
+    db.session.add(offering)
+    db.session.commit()
+    return offering
+
+def _student(db, offering, n):
+    user = User(email=f"grader{n}@test.com", full_name=f"Student {n}")
+    user.password = 'Student123!'
+    db.session.add(user)
+    db.session.flush()
+    enrollment = Enrollment(user_id=user.id, course_offering_id=offering.id, status='enrolled')
+    db.session.add(enrollment)
+    db.session.commit()
+    return user, enrollment
+
+def _setup(db, offering, groups, assignments, scores):
+    """
+    Create groups {name: (weight, drop_lowest)}, assignments [(group name or None, points)]
+    and per-student scores [[grade or None per assignment], ...].
+    Returns [(enrollment, graded tuples for _reference_grade)].
+    """
+    group_ids = {}
+    for name, (weight, drop_lowest) in groups.items():
+        group = AssignmentGroup(course_offering_id=offering.id, name=name, weight=weight, drop_lowest=drop_lowest)
+        db.session.add(group)
+        db.session.flush()
+        group_ids[name] = group.id
+    rows = []
+    for i, (group, points) in enumerate(assignments):
+        assignment = Assignment(
+            course_offering_id=offering.id, group_id=group_ids.get(group),
+            title=f"A{i}", points_possible=points
+        )
+        db.session.add(assignment)
+        db.session.flush()
+        rows.append((assignment, group, points))
+    db.session.commit()
+
+    students = []
+    for n, student_scores in enumerate(scores):
+        user, enrollment = _student(db, offering, n)
+        graded = []
+        for (assignment, group, points), grade in zip(rows, student_scores):
+            db.session.add(Submission(assignment_id=assignment.id, user_id=user.id, grade=grade))
+            if grade is not None:
+                graded.append((group, grade, points))
+        db.session.commit()
+        students.append((enrollment, graded))
+    return students
+
+def test_final_grade_drop_lowest_and_uneven_weights(db, offering):
+    groups = {'homework': (0.25, 1), 'exams': (0.75, 0)}
+    # The ungrouped quiz is ignored once the offering has groups
+    assignments = [('homework', 10), ('homework', 20), ('homework', 10), ('exams', 100), ('exams', 50), (None, 10)]
+    scores = [
+        [9, 11, 3, 88, 41, 1],
+        [10, 20, 10, 100, 50, 10],
+        [2, None, 7, 61, None, 10],
+    ]
+    for enrollment, graded in _setup(db, offering, groups, assignments, scores):
+        graded = [g for g in graded if g[0] is not None]
+        assert calculate_final_grade(enrollment.id) == pytest.approx(_reference_grade(groups, graded))
+
+def test_final_grade_without_assignment_groups(db, offering):
+    assignments = [(None, 10), (None, 40), (None, 50)]
+    scores = [[7, 30, 45], [None, 20, 50]]
+    for enrollment, graded in _setup(db, offering, {}, assignments, scores):
+        assert calculate_final_grade(enrollment.id) == pytest.approx(_reference_grade({}, graded))
+
+def test_final_grade_group_without_graded_work_is_not_weighted(db, offering):
+    groups = {'homework': (0.4, 0), 'exams': (0.6, 0)}
+    assignments = [('homework', 10), ('exams', 100)]
+    (enrollment, graded), = _setup(db, offering, groups, assignments, [[8, None]])
+    assert calculate_final_grade(enrollment.id) == pytest.approx(80)
+    assert _reference_grade(groups, graded) == pytest.approx(80)
+
+def test_final_grade_all_ungraded_is_zero(db, offering):
+    groups = {'homework': (1.0, 1)}
+    assignments = [('homework', 10), ('homework', 10)]
+    (enrollment, _), = _setup(db, offering, groups, assignments, [[None, None]])
+    assert calculate_final_grade(enrollment.id) == 0
+    db.session.refresh(enrollment)
+    assert enrollment.grade == 0
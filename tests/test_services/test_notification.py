@@ -0,0 +1,85 @@
+import pytest
+from app.models import User, Institution, Course, CourseOffering, Enrollment, Notification
+from app.services import notification
+from app.services.notification import notify_users_bulk, notify_course_shard, NOTIFY_CHUNK_SIZE
+
+class _EmailTask:
+    """Stands in for send_async_email and records each chunked dispatch."""
+    def __init__(self):
+        self.chunked = []
+
+    def chunks(self, items, size):
+        self.chunked.append((list(items), size))
+        return self
+
+    def apply_async(self):
+        pass
+
+@pytest.fixture
+def channels(monkeypatch):
+    emitted, sms, email = [], [], _EmailTask()
+    monkeypatch.setattr(notification, 'emit_notification', lambda user_id, payload: emitted.append((user_id, payload)))
+    monkeypatch.setattr(notification, 'send_sms', lambda phone, text: sms.append((phone, text)))
+    monkeypatch.setattr(notification, 'send_async_email', email)
+    return emitted, sms, email
+
+def _user(db, n, **profile):
+    user = User(email=f"notify{n}@test.com", full_name=f"User {n}", profile=profile)
+    user.password = 'Notify123!'
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+DATA = {'title': 'Exam moved', 'message': 'Now on Friday', 'text': 'Exam moved to Friday', 'html': '<p>Friday</p>'}
+
+def test_bulk_emits_each_recipient_its_notification_id(db, channels):
+    emitted, _, _ = channels
+    users = [_user(db, n) for n in range(3)]
+    notify_users_bulk([u.id for u in users], 'announcement', DATA)
+
+    stored = {n.user_id: n.id for n in Notification.query.all()}
+    assert set(stored) == {u.id for u in users}
+    assert sorted(emitted, key=lambda e: e[0]) == [
+        (u.id, {'id': stored[u.id], 'type': 'announcement', 'title': 'Exam moved',
+                'message': 'Now on Friday', 'data': DATA})
+        for u in sorted(users, key=lambda u: u.id)
+    ]
+
+def test_bulk_respects_channel_preferences(db, channels):
+    emitted, sms, email = channels
+    default = _user(db, 1)
+    no_email = _user(db, 2, email_notifications=False)
+    texter = _user(db, 3, sms_notifications=True, phone='+15550100')
+    notify_users_bulk([default.id, no_email.id, texter.id], 'announcement', DATA)
+
+    assert Notification.query.count() == 3
+    assert sms == [('+15550100', 'Exam moved to Friday')]
+    (items, size), = email.chunked
+    assert size == NOTIFY_CHUNK_SIZE
+    assert sorted(item[0] for item in items) == [default.email, texter.email]
+    assert items[0][1:] == ('Exam moved', None, None, '<p>Friday</p>', 'Exam moved to Friday')
+
+def test_course_shards_cover_each_enrolled_student_once(db, channels, monkeypatch):
+    institution = Institution(name='Test U')
+    db.session.add(institution)
+    db.session.flush()
+    course = Course(institution_id=institution.id, code='HIST1', title='History')
+    db.session.add(course)
+    db.session.flush()
+    offering = CourseOffering(course_id=course.id, term='Fall', year=2024, capacity=50)
+    db.session.add(offering)
+    db.session.commit()
+    users = [_user(db, n) for n in range(10)]
+    for i, user in enumerate(users):
+        status = 'dropped' if i == 0 else 'enrolled'
+        db.session.add(Enrollment(user_id=user.id, course_offering_id=offering.id, status=status))
+    db.session.commit()
+
+    notified = []
+    monkeypatch.setattr(notification, 'notify_users_bulk',
+                        lambda user_ids, notification_type, data: notified.extend(user_ids))
+    excluded = users[1].id
+    for shard_idx in range(3):
+        notify_course_shard(offering.id, shard_idx, 3, 'announcement', DATA, [excluded])
+
+    assert sorted(notified) == sorted(u.id for u in users[2:])
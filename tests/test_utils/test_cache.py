@@ -0,0 +1,12 @@
+from app.utils.cache import cache_key
+
+def test_cache_key_is_stable():
+    assert cache_key(1, 'a', b=2) == cache_key(1, 'a', b=2)
+    assert cache_key(a=1, b=2) == cache_key(b=2, a=1)
+
+def test_cache_key_keeps_argument_boundaries():
+    assert cache_key(1, 23) != cache_key(12, 3)
+    assert cache_key('1', '23') != cache_key('12', '3')
+    assert cache_key(a=12) != cache_key(a1=2)
+    assert cache_key(1, a=2) != cache_key(1, 2)
+    assert cache_key((1, 2)) != cache_key(1, 2)
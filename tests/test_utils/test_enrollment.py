@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import text
+from app.models import User, Institution, Course, CourseOffering, Enrollment, Waitlist
+from app.utils import enrollment as enrollment_utils
+from app.utils.deferred import on_commit
+from app.utils.enrollment import enroll_student
+
+class _Recorder:
+    """Stands in for notify_user / send_course_update and records each call."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+
+    def delay(self, *args):
+        self.calls.append(args)
+
+@pytest.fixture
+def notifications(monkeypatch):
+    notify, update = _Recorder(), _Recorder()
+    monkeypatch.setattr(enrollment_utils, 'notify_user', notify)
+    monkeypatch.setattr(enrollment_utils, 'send_course_update', update)
+    return notify, update
+
+def _make_user(db, n):
+    user = User(email=f"student{n}@test.com", full_name=f"Student {n}")
+    user.password = 'Student123!'
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def offering(db):
+    institution = Institution(name='Test U')
+    db.session.add(institution)
+    db.session.flush()
+    course = Course(institution_id=institution.id, code='CS101', title='Intro')
+    db.session.add(course)
+    db.session.flush()
+    offering = CourseOffering(course_id=course.id, term='Fall', year=2024, capacity=1)
+    db.session.add(offering)
+    db.session.commit()
+    return offering
+
+def test_enroll_without_redis_uses_database_guard(db, offering, notifications):
+    # TestingConfig uses NullCache, so _claim_seat has no Redis to talk to
+    assert enrollment_utils._claim_seat(offering.id) is None
+    student = _make_user(db, 1)
+    result = enroll_student(student.id, offering.id)
+    assert 'enrollment_id' in result
+    db.session.refresh(offering)
+    assert offering.enrolled_count == 1
+    notify, update = notifications
+    assert [call[1] for call in notify.calls] == ['enrollment_success']
+    assert len(update.calls) == 1
+
+def test_full_offering_waitlists(db, offering, notifications):
+    first, second = _make_user(db, 1), _make_user(db, 2)
+    enroll_student(first.id, offering.id)
+    result = enroll_student(second.id, offering.id)
+    assert result.get('waitlist') is True
+    assert Waitlist.query.filter_by(user_id=second.id, course_offering_id=offering.id).count() == 1
+    db.session.refresh(offering)
+    assert offering.enrolled_count == 1
+    notify, _ = notifications
+    assert [call[1] for call in notify.calls] == ['enrollment_success', 'waitlist_added']
+
+def test_redis_full_waitlists_before_row_lock(db, offering, notifications, monkeypatch):
+    monkeypatch.setattr(enrollment_utils, '_claim_seat', lambda offering_id: False)
+    student = _make_user(db, 1)
+    result = enroll_student(student.id, offering.id)
+    assert result.get('waitlist') is True
+    db.session.refresh(offering)
+    assert offering.enrolled_count == 0
+
+def test_duplicate_enrollment_rolls_back_and_does_not_notify(db, offering, notifications):
+    offering.capacity = 5
+    db.session.commit()
+    student = _make_user(db, 1)
+    enroll_student(student.id, offering.id)
+    result = enroll_student(student.id, offering.id)
+    assert result == {'error': 'Already enrolled', 'code': 400}
+    db.session.refresh(offering)
+    # The rollback also undid the second seat increment
+    assert offering.enrolled_count == 1
+    assert Enrollment.query.filter_by(user_id=student.id).count() == 1
+    notify, update = notifications
+    assert len(notify.calls) == 1
+    assert len(update.calls) == 1
+
+def test_rollback_discards_on_commit_callbacks(db):
+    fired = []
+    # Open a transaction so the rollback reaches the database
+    db.session.execute(text('SELECT 1'))
+    on_commit(fired.append, 'rolled back')
+    db.session.rollback()
+    db.session.commit()
+    assert fired == []
+    on_commit(fired.append, 'committed')
+    db.session.commit()
+    assert fired == ['committed']
+
+def test_dropping_an_enrollment_frees_its_seat(db, offering, notifications):
+    first, second = _make_user(db, 1), _make_user(db, 2)
+    result = enroll_student(first.id, offering.id)
+    enrollment = db.session.get(Enrollment, result['enrollment_id'])
+    enrollment.status = 'dropped'
+    db.session.commit()
+    db.session.refresh(offering)
+    assert offering.enrolled_count == 0
+    assert 'enrollment_id' in enroll_student(second.id, offering.id)
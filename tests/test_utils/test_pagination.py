@@ -0,0 +1,95 @@
+import base64
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Integer, String
+from app.errors import ValidationError
+from app.utils.pagination import paginate, _encode_cursor, _decode_cursor
+
+_db = SQLAlchemy()
+
+class Item(_db.Model):
+    __tablename__ = 'pagination_items'
+    id = _db.Column(Integer, primary_key=True)
+    name = _db.Column(String(20))
+
+class _IdSchema:
+    def dump(self, rows, many=False):
+        return [row.id for row in rows]
+
+# Non-contiguous ids, inserted out of order; names repeat across ids
+_ROWS = {7: 'b', 1: 'a', 3: 'b', 12: 'a', 5: 'c', 9: 'b', 2: 'a', 20: 'c'}
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.add_url_rule('/items', 'items', lambda: '')
+    _db.init_app(app)
+    with app.app_context():
+        _db.create_all()
+        _db.session.add_all(Item(id=i, name=name) for i, name in _ROWS.items())
+        _db.session.commit()
+        yield app
+        _db.drop_all()
+
+def test_cursor_round_trip():
+    assert _decode_cursor(_encode_cursor(42), Item.id) == 42
+    assert _decode_cursor(_encode_cursor(2 ** 40), Item.id) == 2 ** 40
+    assert _decode_cursor(_encode_cursor('abc'), Item.name) == 'abc'
+    assert _decode_cursor(_encode_cursor('abc', 7), Item.name, Item.id) == ('abc', 7)
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    'AAAA',
+    _encode_cursor(5) + 'AAAA',
+    _encode_cursor('x' * 8)[:-2],
+    _encode_cursor(5, 6),
+])
+def test_malformed_int_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor, Item.id)
+
+def test_string_cursor_without_tiebreaker_rejected():
+    with pytest.raises(ValueError):
+        _decode_cursor(_encode_cursor('a'), Item.name, Item.id)
+
+def test_non_utf8_string_cursor_rejected():
+    with pytest.raises(ValueError):
+        _decode_cursor(base64.urlsafe_b64encode(b'\xff\xfe').decode(), Item.name)
+
+def _walk(app, query, per_page, cursor_field='id'):
+    seen, cursor = [], None
+    while True:
+        url = f"/items?per_page={per_page}" + (f"&cursor={cursor}" if cursor else '')
+        with app.test_request_context(url):
+            page = paginate(query(), _IdSchema(), 'items', cursor_field=cursor_field)
+        assert len(page['items']) <= per_page
+        seen.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return seen
+
+@pytest.mark.parametrize('per_page', [1, 3, 4, 8, 20])
+def test_keyset_pages_cover_every_row_once(app, per_page):
+    assert _walk(app, lambda: Item.query.order_by(Item.id), per_page) == sorted(_ROWS)
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 5])
+def test_keyset_pages_on_non_unique_column_break_ties_by_id(app, per_page):
+    # Page boundaries fall inside runs of equal names
+    expected = [i for i, _ in sorted(_ROWS.items(), key=lambda row: (row[1], row[0]))]
+    query = lambda: Item.query.order_by(Item.name, Item.id)
+    assert _walk(app, query, per_page, cursor_field='name') == expected
+
+def test_cursor_page_skips_count(app):
+    with app.test_request_context(f"/items?per_page=2&cursor={_encode_cursor(3)}"):
+        page = paginate(Item.query, _IdSchema(), 'items')
+    assert page['items'] == [5, 7]
+    assert 'total' not in page
+
+@pytest.mark.parametrize('cursor', ['%21%21%21', _encode_cursor(5, 6)])
+def test_invalid_cursor_is_rejected(app, cursor):
+    with app.test_request_context(f"/items?per_page=3&cursor={cursor}"):
+        with pytest.raises(ValidationError) as exc:
+            paginate(Item.query, _IdSchema(), 'items')
+    assert exc.value.status_code == 400
@@ -0,0 +1,21 @@
+from app.utils.security import sanitize_input
+
+def test_sanitize_input_escapes_html_characters():
+    assert sanitize_input('<b>') == '&lt;b&gt;'
+    assert sanitize_input('a & b') == 'a &amp; b'
+    assert sanitize_input('"quoted"') == '&quot;quoted&quot;'
+    assert sanitize_input("it's") == 'it&#39;s'
+    assert sanitize_input('<a href="x">&</a>') == '&lt;a href=&quot;x&quot;&gt;&amp;&lt;/a&gt;'
+
+def test_sanitize_input_empty_and_plain():
+    assert sanitize_input('') == ''
+    assert sanitize_input('plain text') == 'plain text'
+
+def test_sanitize_input_escapes_already_escaped_input_again():
+    # Not idempotent: '&' is always escaped, so entities are escaped once more
+    assert sanitize_input('&lt;b&gt;') == '&amp;lt;b&amp;gt;'
+    assert sanitize_input(sanitize_input('<')) == '&amp;lt;'
+
+def test_sanitize_input_passes_non_strings_through():
+    assert sanitize_input(None) is None
+    assert sanitize_input(5) == 5
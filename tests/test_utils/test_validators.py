@@ -0,0 +1,27 @@
+from app.utils.validators import validate_password
+
+def test_validate_password_accepts_all_classes():
+    assert validate_password('Abcdefg1')
+    assert validate_password('1abcdefG')
+
+def test_validate_password_rejects_missing_class():
+    assert not validate_password('Abc1')
+    assert not validate_password('abcdefg1')
+    assert not validate_password('ABCDEFG1')
+    assert not validate_password('Abcdefgh')
+
+def test_validate_password_ascii_only():
+    # Non-ASCII letters do not count towards the upper/lower requirement
+    assert not validate_password('ébcdefg1É')
+
+def test_registration_schema_password_and_unknown_fields():
+    from marshmallow import ValidationError
+    from app.utils.validators import user_registration_schema
+    payload = {'email': 'a@b.co', 'password': 'Abcdefg1', 'full_name': 'A', 'accept_terms': True}
+    assert user_registration_schema.load({**payload, 'extra': 1}) == payload
+    try:
+        user_registration_schema.load({**payload, 'password': 'abcdefgh1'})
+    except ValidationError as e:
+        assert 'password' in e.messages
+    else:
+        raise AssertionError('weak password accepted')